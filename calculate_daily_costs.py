@@ -1,8 +1,11 @@
 import pandas as pd
 import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from compact_results import read_costed_results, iter_costed_chunks, RESULTS_FILE, COMPACT_DIR
+from stage_profiler import stage, run_main
 
 def create_visualizations(meal_costs, daily_costs, monthly_total):
     """Create and save visualizations of the cost distribution"""
@@ -89,17 +92,31 @@ def create_visualizations(meal_costs, daily_costs, monthly_total):
     
     return plots_dir
 
-def calculate_meal_costs():
-    print("Loading meal plan with calculated costs...")
-    
-    # Read the meal plan with calculated costs
-    input_file = os.path.join("output", "meal_plan_with_calculated_costs.xlsx")
-    df = pd.read_excel(input_file)
-    
-    # Group by day and category (meal type) to get meal costs
-    meal_costs = df.groupby(['day', 'category', 'recipe_name'])['cost'].sum().reset_index()
-    
-    # Calculate daily totals
+MEAL_KEYS = ['day', 'category', 'recipe_name']
+
+def stream_meal_costs(chunk_rows=500000, results_file=RESULTS_FILE, compact_dir=COMPACT_DIR):
+    """
+    Sum ingredient costs per meal without loading the whole costed table.
+    Each chunk is reduced to partial (day, category, recipe) sums; the partials are
+    merged at the end, so memory is bounded by the number of meals, not ingredients.
+    """
+    partial_sums = []
+    rows = 0
+    for chunk in iter_costed_chunks(results_file, compact_dir, chunk_rows, columns=MEAL_KEYS + ['cost']):
+        chunk['cost'] = pd.to_numeric(chunk['cost'], errors='coerce')
+        partial_sums.append(chunk.groupby(MEAL_KEYS, observed=True)['cost'].sum())
+        rows += len(chunk)
+        # Meals cut by a chunk boundary appear twice; fold the partials together now and then
+        if len(partial_sums) >= 16:
+            partial_sums = [pd.concat(partial_sums).groupby(level=[0, 1, 2], observed=True).sum()]
+    print(f"Aggregated {rows} costed ingredients in chunks of {chunk_rows}")
+    if not partial_sums:
+        return pd.DataFrame(columns=MEAL_KEYS + ['cost'])
+    meal_costs = pd.concat(partial_sums).groupby(level=[0, 1, 2], observed=True).sum()
+    return meal_costs.reset_index()
+
+def build_daily_costs(meal_costs):
+    """One row per day with the {meal type: cost} breakdown and the day's total"""
     daily_costs = meal_costs.groupby('day').agg({
         'category': lambda x: dict(zip(x, meal_costs.loc[x.index, 'cost'])),
         'cost': 'sum'
@@ -107,6 +124,29 @@ def calculate_meal_costs():
     
     # Rename columns for clarity
     daily_costs.columns = ['Day', 'Meal Costs', 'Total Daily Cost']
+    return daily_costs
+
+def calculate_meal_costs(stream=False, chunk_rows=500000):
+    print("Loading meal plan with calculated costs...")
+    
+    if stream:
+        with stage("stream meal costs"):
+            meal_costs = stream_meal_costs(chunk_rows)
+    else:
+        # Read the meal plan with calculated costs (compact copy when available)
+        with stage("load costs"):
+            df = read_costed_results(columns=MEAL_KEYS + ['cost'])
+        
+        # Group by day and category (meal type) to get meal costs
+        with stage("meal costs"):
+            meal_costs = df.groupby(MEAL_KEYS, observed=True)['cost'].sum().reset_index()
+    
+    # One row per meal from here on, so plain strings are cheap again
+    meal_costs[['category', 'recipe_name']] = meal_costs[['category', 'recipe_name']].astype(object)
+    
+    # Calculate daily totals
+    with stage("daily totals"):
+        daily_costs = build_daily_costs(meal_costs)
     
     # Calculate monthly total
     monthly_total = daily_costs['Total Daily Cost'].sum()
@@ -127,16 +167,19 @@ def calculate_meal_costs():
     cheapest_meals = meal_costs_with_names.nsmallest(5, 'cost')
     
     # Create visualizations
-    plots_dir = create_visualizations(meal_costs, daily_costs, monthly_total)
+    with stage("charts"):
+        plots_dir = create_visualizations(meal_costs, daily_costs, monthly_total)
     
     # Save detailed meal costs
     meal_costs_file = os.path.join("output", "recipe_total_costs.xlsx")
-    meal_costs.to_excel(meal_costs_file, index=False)
+    with stage("write excel"):
+        meal_costs.to_excel(meal_costs_file, index=False)
     print(f"Detailed recipe costs saved to: {meal_costs_file}")
     
     # Save daily costs
     daily_costs_file = os.path.join("output", "daily_costs_per_month.xlsx")
-    daily_costs.to_excel(daily_costs_file, index=False)
+    with stage("write excel"):
+        daily_costs.to_excel(daily_costs_file, index=False)
     print(f"Daily costs saved to: {daily_costs_file}")
     
     # Print summary statistics
@@ -167,5 +210,12 @@ def calculate_meal_costs():
         for meal_type, cost in row['Meal Costs'].items():
             print(f"  {meal_type}: {cost:.2f} TL")
 
+def main():
+    # Usage: python calculate_daily_costs.py [--stream [chunk_rows]] [--profile]
+    if len(sys.argv) > 1 and sys.argv[1] == '--stream':
+        calculate_meal_costs(stream=True, chunk_rows=int(sys.argv[2]) if len(sys.argv) > 2 else 500000)
+    else:
+        calculate_meal_costs()
+
 if __name__ == "__main__":
-    calculate_meal_costs() 
\ No newline at end of file
+    run_main(main, "calculate_daily_costs") 
\ No newline at end of file
@@ -0,0 +1,168 @@
+import json
+import os
+from array import array
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+RESULTS_FILE = os.path.join("output", "meal_plan_with_calculated_costs.xlsx")
+COMPACT_DIR = os.path.join("output", "meal_plan_with_calculated_costs")
+
+RESULT_COLUMNS = [
+    'day', 'category', 'recipe_name', 'meal_ingredient', 'matched_ingredient', 'score',
+    'recipe_amount', 'recipe_unit', 'price', 'price_amount', 'price_unit',
+    'converted_amount', 'final_unit', 'cost', 'match_status', 'debug_issue'
+]
+STRING_COLUMNS = [
+    'category', 'recipe_name', 'meal_ingredient', 'matched_ingredient', 'recipe_unit',
+    'price_unit', 'final_unit', 'match_status', 'debug_issue'
+]
+# Only the match score is stored as float32; amounts and prices are published as
+# they are, so they keep full precision along with quantities and costs
+FLOAT32_COLUMNS = ['score']
+FLOAT64_COLUMNS = ['recipe_amount', 'price', 'price_amount', 'converted_amount', 'cost']
+
+class ResultsTable:
+    """
+    Column-wise builder for the costed ingredient table.
+    Strings are interned into integer codes and numbers go straight into typed arrays,
+    so no per-row dict or Python object is kept once a row is appended.
+    """
+    def __init__(self):
+        self.days = array('i')
+        self.codes = {column: array('i') for column in STRING_COLUMNS}
+        self.lookup = {column: {} for column in STRING_COLUMNS}
+        self.values = {column: array('f') for column in FLOAT32_COLUMNS}
+        self.values.update({column: array('d') for column in FLOAT64_COLUMNS})
+
+    def append(self, result):
+        self.days.append(int(result['day']) if result.get('day') is not None else -1)
+        for column in STRING_COLUMNS:
+            value = result.get(column)
+            if value is None:
+                self.codes[column].append(-1)
+                continue
+            lookup = self.lookup[column]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            self.codes[column].append(code)
+        for column, values in self.values.items():
+            value = result.get(column)
+            values.append(np.nan if value is None else value)
+
+    def __len__(self):
+        return len(self.days)
+
+    def to_frame(self):
+        """Build the DataFrame with categorical string columns and float32/float64 numbers"""
+        data = {'day': np.frombuffer(self.days, dtype=np.int32).copy()}
+        for column in STRING_COLUMNS:
+            # Sort the categories so groupby orders rows the same way as with plain strings
+            values = list(self.lookup[column])
+            order = sorted(range(len(values)), key=values.__getitem__)
+            recode = np.empty(len(values) + 1, dtype=np.int32)
+            recode[np.array(order, dtype=np.int64)] = np.arange(len(values))
+            recode[-1] = -1
+            codes = recode[np.frombuffer(self.codes[column], dtype=np.int32)]
+            categories = pd.Index([values[i] for i in order], dtype=object)
+            data[column] = pd.Categorical.from_codes(codes, categories=categories)
+        for column, values in self.values.items():
+            data[column] = np.frombuffer(values, dtype=np.float32 if values.typecode == 'f' else np.float64).copy()
+        return pd.DataFrame(data)[RESULT_COLUMNS]
+
+def compact_frame(df):
+    """Convert a results DataFrame read from Excel into the compact dtypes"""
+    df = df.copy()
+    for column in STRING_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype('category')
+    for column in FLOAT32_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype(np.float32)
+    if 'day' in df:
+        df['day'] = df['day'].astype(np.int32)
+    return df
+
+def save_compact(df, path=COMPACT_DIR):
+    """Save each column as a .npy file (category codes for strings) plus a meta.json"""
+    os.makedirs(path, exist_ok=True)
+    meta = {'rows': len(df), 'columns': {}}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(path, f"{column}.npy"), series.cat.codes.to_numpy())
+            meta['columns'][column] = {'kind': 'category', 'categories': [str(c) for c in series.cat.categories]}
+        else:
+            np.save(os.path.join(path, f"{column}.npy"), series.to_numpy())
+            meta['columns'][column] = {'kind': 'values'}
+    # meta.json is written last so a complete directory always has one
+    with open(os.path.join(path, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return path
+
+def mark_compact_current(path=COMPACT_DIR):
+    """Touch meta.json so has_current_compact keeps the copy after the Excel file is rewritten from the same data"""
+    os.utime(os.path.join(path, "meta.json"))
+
+def read_meta(path=COMPACT_DIR):
+    with open(os.path.join(path, "meta.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_compact(path=COMPACT_DIR, columns=None, start=0, stop=None, meta=None):
+    """Load rows [start, stop) of the given columns; column files are memory-mapped"""
+    meta = meta or read_meta(path)
+    columns = columns or list(meta['columns'])
+    data = {}
+    for column in columns:
+        values = np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r')[start:stop]
+        info = meta['columns'][column]
+        if info['kind'] == 'category':
+            data[column] = pd.Categorical.from_codes(np.asarray(values), categories=pd.Index(info['categories'], dtype=object))
+        else:
+            data[column] = np.array(values)
+    return pd.DataFrame(data)
+
+def iter_compact_chunks(path=COMPACT_DIR, chunk_rows=500000, columns=None):
+    """Yield the table in DataFrames of at most chunk_rows rows"""
+    meta = read_meta(path)
+    for start in range(0, meta['rows'], chunk_rows):
+        yield load_compact(path, columns, start, start + chunk_rows, meta)
+
+def has_current_compact(results_file=RESULTS_FILE, compact_dir=COMPACT_DIR):
+    """True when the compact table exists and is not older than the Excel results"""
+    meta_file = os.path.join(compact_dir, "meta.json")
+    if not os.path.exists(meta_file):
+        return False
+    return not os.path.exists(results_file) or os.path.getmtime(meta_file) >= os.path.getmtime(results_file)
+
+def iter_excel_chunks(path=RESULTS_FILE, chunk_rows=500000, columns=None):
+    """Stream an Excel results file in DataFrames of at most chunk_rows rows"""
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, []))
+        keep = [header.index(column) for column in columns] if columns else list(range(len(header)))
+        names = [header[i] for i in keep]
+        chunk = []
+        for row in rows:
+            chunk.append([row[i] for i in keep])
+            if len(chunk) == chunk_rows:
+                yield pd.DataFrame(chunk, columns=names)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=names)
+    finally:
+        workbook.close()
+
+def iter_costed_chunks(results_file=RESULTS_FILE, compact_dir=COMPACT_DIR, chunk_rows=500000, columns=None):
+    """Stream the costed ingredient table, preferring the compact copy over the Excel file"""
+    if has_current_compact(results_file, compact_dir):
+        return iter_compact_chunks(compact_dir, chunk_rows, columns)
+    return iter_excel_chunks(results_file, chunk_rows, columns)
+
+def read_costed_results(results_file=RESULTS_FILE, compact_dir=COMPACT_DIR, columns=None):
+    """Load the costed ingredient table, preferring the compact copy over the Excel file"""
+    if has_current_compact(results_file, compact_dir):
+        return load_compact(compact_dir, columns)
+    return compact_frame(pd.read_excel(results_file, usecols=columns))
@@ -0,0 +1,106 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+from main_model_old import load_price_data, build_matcher, match_and_convert, iter_recipe_ingredients, recipe_key
+from stage_profiler import stage, run_main
+
+CORPUS_COSTS_FILE = os.path.join("output", "recipe_corpus_costs.xlsx")
+CORPUS_KEYS = {'breakfast_recipes': 'breakfast', 'main_course_recipes': 'main_course'}
+LINE_KEYS = ['meal_ingredient', 'recipe_amount', 'recipe_unit']
+
+def unique_corpus_recipes(meal_plan_json, keys=CORPUS_KEYS):
+    """(course, recipe) for every recipe of the corpus lists, keeping the first copy of recipes listed twice"""
+    seen = set()
+    recipes = []
+    for key, course in keys.items():
+        for recipe in meal_plan_json.get(key, []):
+            if not recipe or not isinstance(recipe, dict):
+                continue
+            identity = recipe_key(recipe)
+            if identity in seen:
+                continue
+            seen.add(identity)
+            recipes.append((course, recipe))
+    return recipes
+
+def cost_corpus(recipes, price_df, vectorizer=None, price_vecs=None):
+    """
+    Cost a list of (course, recipe) pairs in one batched pass.
+    Recipes share most of their lines ("1 su bardağı un", "tuz"), so the ingredient lines
+    are deduplicated first and each distinct line is matched and converted once; recipe
+    costs are then summed with one bincount.
+    Returns (one row per recipe, number of ingredient lines, number of distinct lines).
+    """
+    lines = pd.DataFrame(
+        [(i, text, amount, unit) for i, (_, recipe) in enumerate(recipes)
+         for text, amount, unit in iter_recipe_ingredients(recipe)],
+        columns=['recipe'] + LINE_KEYS
+    )
+    line_pos = lines.groupby(LINE_KEYS, sort=False, dropna=False).ngroup().to_numpy()
+    distinct = lines.drop_duplicates(LINE_KEYS)[LINE_KEYS].reset_index(drop=True)
+    basis = match_and_convert(distinct, price_df, vectorizer, price_vecs)
+
+    amounts = price_df['amount'].to_numpy(dtype=float)
+    unit_prices = np.nan_to_num(price_df['price'].to_numpy(dtype=float) / np.where(amounts == 0, np.nan, amounts))
+    price_idx = basis['price_idx'].to_numpy()
+    distinct_costs = np.where(price_idx >= 0, basis['converted_amount'].to_numpy() * unit_prices[np.maximum(price_idx, 0)], 0.0)
+
+    recipe_ids = lines['recipe'].to_numpy()
+    costed = price_idx[line_pos] >= 0
+    return pd.DataFrame({
+        'course': [course for course, _ in recipes],
+        'recipe_name': [recipe.get('name', recipe.get('title', 'Unknown Recipe')) for _, recipe in recipes],
+        'url': [recipe.get('url') for _, recipe in recipes],
+        'cost': np.bincount(recipe_ids, weights=distinct_costs[line_pos], minlength=len(recipes)),
+        'ingredients': np.bincount(recipe_ids, minlength=len(recipes)),
+        'costed_ingredients': np.bincount(recipe_ids, weights=costed, minlength=len(recipes)).astype(int),
+    }), len(lines), len(distinct)
+
+def load_corpus_costs(path=CORPUS_COSTS_FILE):
+    return pd.read_excel(path)
+
+def corpus_meal_costs(corpus_df):
+    """
+    Corpus costs in the layout of recipe_total_costs.xlsx (category, recipe_name, cost).
+    Main courses alternate between lunch and dinner, the way create_meal_plan pairs them.
+    """
+    breakfasts = corpus_df[corpus_df['course'] == 'breakfast']
+    main_courses = corpus_df[corpus_df['course'] == 'main_course'].reset_index(drop=True)
+    meals = pd.concat([
+        breakfasts.assign(category='breakfast'),
+        main_courses.iloc[0::2].assign(category='lunch'),
+        main_courses.iloc[1::2].assign(category='dinner'),
+    ], ignore_index=True)
+    return meals[['category', 'recipe_name', 'cost']]
+
+def main():
+    # Usage: python corpus_costs.py [meal_plan_file] [ingredients_file]
+    meal_plan_file = sys.argv[1] if len(sys.argv) > 1 else 'meal_plan.json'
+    ingredients_file = sys.argv[2] if len(sys.argv) > 2 else 'unique_ingredients2.xlsx'
+
+    with stage("load inputs"):
+        price_df = load_price_data(ingredients_file)
+        with open(meal_plan_file, 'r', encoding='utf-8') as f:
+            recipes = unique_corpus_recipes(json.load(f))
+    print(f"Costing {len(recipes)} unique recipes against {len(price_df)} priced ingredients...")
+
+    with stage("fit matcher"):
+        vectorizer, price_vecs = build_matcher(price_df)
+    with stage("cost corpus"):
+        corpus_df, line_count, distinct_count = cost_corpus(recipes, price_df, vectorizer, price_vecs)
+    print(f"Matched and converted {distinct_count} distinct lines for {line_count} ingredient lines")
+
+    os.makedirs("output", exist_ok=True)
+    with stage("write excel"):
+        corpus_df.to_excel(CORPUS_COSTS_FILE, index=False)
+
+    print("\n=== CORPUS COSTS ===")
+    for course, group in corpus_df.groupby('course', sort=False):
+        print(f"{course}: {len(group)} recipes, average {group['cost'].mean():.2f} TL, "
+              f"{group['costed_ingredients'].sum()}/{group['ingredients'].sum()} ingredients costed")
+    print(f"\nRecipe costs saved to: {CORPUS_COSTS_FILE}")
+
+if __name__ == "__main__":
+    run_main(main, "corpus_costs")
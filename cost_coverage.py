@@ -0,0 +1,111 @@
+import json
+import os
+from collections import Counter, defaultdict
+
+REPORT_FILE = os.path.join("output", "cost_coverage_report.json")
+SCORE_BINS = 10
+
+def issue_reason(debug_issue):
+    """Reduce a debug message such as 'unit mismatch: recipe lt, price kg' to its reason"""
+    return (debug_issue or 'unknown').split(':')[0].strip()
+
+class CoverageTracker:
+    """
+    Running match-quality and cost-coverage aggregates, updated one costed
+    ingredient at a time so the full results table never has to be reloaded.
+    """
+    def __init__(self, top_n=20):
+        self.top_n = top_n
+        self.total = 0
+        self.costed = 0
+        self.cost_sum = 0.0
+        self.missing_by_reason = Counter()
+        self.missing_by_detail = Counter()
+        self.missing_by_category = Counter()
+        self.lines_by_category = Counter()
+        self.score_histogram = [0] * SCORE_BINS
+        self.matched_score_histogram = [0] * SCORE_BINS
+        self.missing_ingredients = Counter()
+        self.missing_ingredient_reasons = defaultdict(Counter)
+        self.missing_by_recipe = Counter()
+
+    def add(self, result):
+        """Update the aggregates with one row of main_model_old results"""
+        self.total += 1
+        category = result.get('category')
+        self.lines_by_category[category] += 1
+
+        score = result.get('score')
+        if score is not None:
+            score_bin = min(int(score * SCORE_BINS), SCORE_BINS - 1)
+            self.score_histogram[score_bin] += 1
+            if result.get('match_status') == 'Matched':
+                self.matched_score_histogram[score_bin] += 1
+
+        cost = result.get('cost')
+        if cost is not None:
+            self.costed += 1
+            self.cost_sum += cost
+            return
+
+        debug_issue = result.get('debug_issue')
+        reason = issue_reason(debug_issue)
+        ingredient = result.get('meal_ingredient')
+        self.missing_by_reason[reason] += 1
+        self.missing_by_detail[debug_issue] += 1
+        self.missing_by_category[category] += 1
+        self.missing_ingredients[ingredient] += 1
+        self.missing_ingredient_reasons[ingredient][reason] += 1
+        self.missing_by_recipe[result.get('recipe_name')] += 1
+
+    def summary(self):
+        """Return the report as a plain dict"""
+        missing = self.total - self.costed
+        bin_width = 1 / SCORE_BINS
+        histogram = [
+            {'range': f"{i * bin_width:.1f}-{(i + 1) * bin_width:.1f}",
+             'count': count, 'matched': self.matched_score_histogram[i]}
+            for i, count in enumerate(self.score_histogram)
+        ]
+        return {
+            'total_ingredients': self.total,
+            'costed_ingredients': self.costed,
+            'missing_costs': missing,
+            'coverage_percent': round(self.costed / self.total * 100, 2) if self.total else 0.0,
+            'costed_total': round(self.cost_sum, 2),
+            'missing_by_reason': dict(self.missing_by_reason.most_common()),
+            'missing_by_detail': dict(self.missing_by_detail.most_common(self.top_n)),
+            'coverage_by_category': {
+                category: {
+                    'lines': lines,
+                    'missing': self.missing_by_category[category],
+                    'coverage_percent': round((lines - self.missing_by_category[category]) / lines * 100, 2)
+                }
+                for category, lines in self.lines_by_category.items()
+            },
+            'score_histogram': histogram,
+            'top_missing_ingredients': [
+                {'ingredient': ingredient, 'count': count,
+                 'reason': self.missing_ingredient_reasons[ingredient].most_common(1)[0][0]}
+                for ingredient, count in self.missing_ingredients.most_common(self.top_n)
+            ],
+            'recipes_with_most_gaps': dict(self.missing_by_recipe.most_common(self.top_n)),
+        }
+
+    def write_report(self, path=REPORT_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def print_summary(self, top_n=10):
+        summary = self.summary()
+        print("\n=== COST COVERAGE ===")
+        print(f"Costed {summary['costed_ingredients']}/{summary['total_ingredients']} ingredients "
+              f"({summary['coverage_percent']:.1f}%)")
+        print("\nMissing costs by reason:")
+        for reason, count in summary['missing_by_reason'].items():
+            print(f"  {reason}: {count}")
+        print("\nMost frequent ingredients without a cost:")
+        for row in summary['top_missing_ingredients'][:top_n]:
+            print(f"  {row['ingredient']}: {row['count']} ({row['reason']})")
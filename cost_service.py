@@ -0,0 +1,216 @@
+import json
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+import numpy as np
+from main_model_old import load_price_data, build_matcher, match_ingredients, cost_matched_ingredient, iter_plan_ingredients
+from recipes_vbg_2 import parse_amount
+from stage_profiler import run_main
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+METRIC_WINDOW = 1000
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class CostService:
+    """
+    Price catalog and TF-IDF matcher loaded once and kept warm in memory.
+    Matches are cached per ingredient text and costs per (text, amount, unit) line,
+    so repeated lines skip both the vectorizer and the unit conversion.
+    """
+    def __init__(self, ingredients_file):
+        self.ingredients_file = ingredients_file
+        self.price_df = load_price_data(ingredients_file)
+        self.vectorizer, self.price_vecs = build_matcher(self.price_df)
+        self.match_cache = {}
+        self.line_cache = {}
+        self.lock = threading.Lock()
+        self.timings = defaultdict(lambda: deque(maxlen=METRIC_WINDOW))
+        self.counts = defaultdict(int)
+        self.started = time.time()
+
+    def match(self, ing_texts):
+        """Best (index, score) for each text, matching all uncached texts in one batch"""
+        with self.lock:
+            missing = [t for t in dict.fromkeys(ing_texts) if t not in self.match_cache]
+        if missing:
+            best_idx, best_score = match_ingredients(missing, self.vectorizer, self.price_vecs)
+            with self.lock:
+                self.match_cache.update(zip(missing, zip(best_idx, best_score)))
+        with self.lock:
+            return [self.match_cache[t] for t in ing_texts]
+
+    def cost_lines(self, lines):
+        """Cost (ing_text, ing_amount, ing_unit) tuples with the same rules as main_model_old"""
+        with self.lock:
+            new_lines = [line for line in dict.fromkeys(lines) if line not in self.line_cache]
+        if new_lines:
+            matches = self.match([text for text, _, _ in new_lines])
+            costed = {
+                (text, amount, unit): cost_matched_ingredient(text, amount, unit, self.price_df, best_idx, best_score)
+                for (text, amount, unit), (best_idx, best_score) in zip(new_lines, matches)
+            }
+            with self.lock:
+                self.line_cache.update(costed)
+        with self.lock:
+            return [dict(self.line_cache[line]) for line in lines]
+
+    @staticmethod
+    def ingredient_line(ingredient):
+        """Accept a meal_plan.json ingredient dict or a plain line such as '2 su bardağı süt'"""
+        if isinstance(ingredient, str):
+            ingredient = {'text': ingredient}
+        text = ingredient.get('text', '').strip()
+        if 'amount' in ingredient or 'unit' in ingredient:
+            amount, unit = ingredient.get('amount', 1), ingredient.get('unit', '')
+        else:
+            amount, unit = parse_amount(text)
+        return text.lower(), amount, unit.strip().lower()
+
+    def cost_ingredient(self, payload):
+        return self.cost_lines([self.ingredient_line(payload)])[0]
+
+    def cost_recipe(self, payload):
+        lines = [self.ingredient_line(i) for i in payload.get('ingredients', [])]
+        lines = [line for line in lines if line[0]]
+        ingredients = self.cost_lines(lines)
+        costs = [i['cost'] for i in ingredients if i['cost'] is not None]
+        return {
+            'recipe_name': payload.get('name', payload.get('title', 'Unknown Recipe')),
+            'cost': sum(costs),
+            'missing_costs': len(ingredients) - len(costs),
+            'ingredients': ingredients
+        }
+
+    def cost_plan(self, payload):
+        meal_plan = payload['meal_plan'] if isinstance(payload, dict) else payload
+        rows = list(iter_plan_ingredients(meal_plan))
+        costed = self.cost_lines([(text, amount, unit) for _, _, _, text, amount, unit in rows])
+        daily = defaultdict(lambda: defaultdict(float))
+        missing = 0
+        for (day, meal_type, _, _, _, _), result in zip(rows, costed):
+            meal_costs = daily[day]
+            if result['cost'] is None:
+                missing += 1
+                continue
+            meal_costs[meal_type] += result['cost']
+        days = [{'day': day, 'meal_costs': dict(meals), 'total': sum(meals.values())} for day, meals in daily.items()]
+        return {
+            'days': days,
+            'monthly_total': sum(d['total'] for d in days),
+            'missing_costs': missing
+        }
+
+    def handle(self, endpoint, payload):
+        handlers = {
+            'ingredient': self.cost_ingredient,
+            'recipe': self.cost_recipe,
+            'plan': self.cost_plan,
+        }
+        if endpoint == 'batch':
+            return {'results': [self.handle(item.get('type'), item.get('payload', {})) for item in payload.get('requests', [])]}
+        if endpoint not in handlers:
+            raise KeyError(f"Unknown endpoint: {endpoint}")
+        return handlers[endpoint](payload)
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            self.counts[endpoint] += 1
+            self.timings[endpoint].append(seconds * 1000)
+
+    def metrics(self):
+        with self.lock:
+            endpoints = {}
+            for endpoint, timings in self.timings.items():
+                values = np.array(timings)
+                endpoints[endpoint] = {
+                    'requests': self.counts[endpoint],
+                    'mean_ms': round(values.mean(), 3),
+                    'p50_ms': round(np.percentile(values, 50), 3),
+                    'p95_ms': round(np.percentile(values, 95), 3),
+                    'max_ms': round(values.max(), 3),
+                }
+            return {
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'catalog_size': len(self.price_df),
+                'cached_matches': len(self.match_cache),
+                'endpoints': endpoints
+            }
+
+def make_handler(service):
+    class CostRequestHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, data):
+            body = json.dumps(data, ensure_ascii=False, default=_json_value).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self.send_json(200, {'status': 'ok'})
+            elif self.path == '/metrics':
+                self.send_json(200, service.metrics())
+            else:
+                self.send_json(404, {'error': f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            start = time.perf_counter()
+            endpoint = self.path.strip('/').split('/')[-1]
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                result = service.handle(endpoint, payload)
+            except KeyError as e:
+                self.send_json(404, {'error': str(e)})
+                return
+            except Exception as e:
+                self.send_json(400, {'error': str(e)})
+                return
+            elapsed = time.perf_counter() - start
+            service.record(endpoint, elapsed)
+            result['elapsed_ms'] = round(elapsed * 1000, 3)
+            self.send_json(200, result)
+
+        def log_message(self, format, *args):
+            pass
+
+    return CostRequestHandler
+
+def query_service(path, payload=None, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30):
+    """Call a running cost service, e.g. query_service('/cost/recipe', recipe)"""
+    url = f"http://{host}:{port}{path}"
+    data = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else None
+    request = Request(url, data=data, headers={'Content-Type': 'application/json'})
+    with urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+def main():
+    # Usage: python cost_service.py [ingredients_file] [port]
+    ingredients_file = sys.argv[1] if len(sys.argv) > 1 else 'unique_ingredients2.xlsx'
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+
+    print(f"Loading price catalog from: {ingredients_file}")
+    service = CostService(ingredients_file)
+    print(f"Loaded {len(service.price_df)} ingredients with prices")
+
+    server = ThreadingHTTPServer((DEFAULT_HOST, port), make_handler(service))
+    print(f"Cost service listening on http://{DEFAULT_HOST}:{port}")
+    print("POST /cost/ingredient, /cost/recipe, /cost/plan, /cost/batch; GET /metrics, /health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping cost service")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    run_main(main, "cost_service")
@@ -1,8 +1,27 @@
 import pandas as pd
+import numpy as np
 import os
+import sys
+from corpus_costs import load_corpus_costs, corpus_meal_costs, CORPUS_COSTS_FILE
+from stage_profiler import stage, run_main
 
-def generate_daily_plan(recipe_costs_path, output_path, num_days=30):
-    df = pd.read_excel(recipe_costs_path)
+def generate_daily_plan(recipe_costs_path, output_path, num_days=30, corpus=False):
+    """
+    Write a num_days plan rotating through the recipes of recipe_costs_path.
+    With corpus=True the file is a corpus_costs.py table (one row per course and recipe)
+    and its main courses are split into lunches and dinners first.
+    """
+    with stage("load recipe costs"):
+        if corpus:
+            df = corpus_meal_costs(load_corpus_costs(recipe_costs_path))
+        else:
+            df = pd.read_excel(recipe_costs_path)
+    plan_df = build_daily_plan_vectorized(df, num_days)
+    with stage("write excel"):
+        plan_df.to_excel(output_path, index=False)
+
+def split_meal_categories(df):
+    """Breakfast, lunch and dinner rows of a recipe cost table, each reindexed from 0"""
     # Ensure columns are as expected
     df.columns = [col.strip() for col in df.columns]
     breakfasts = df[df['category'].str.lower() == 'breakfast'].reset_index(drop=True)
@@ -17,6 +36,11 @@ def generate_daily_plan(recipe_costs_path, output_path, num_days=30):
             f"Breakfasts: {len(breakfasts)}, Lunches: {len(lunches)}, Dinners: {len(dinners)}. "
             "Check your category column values in recipe_total_costs.xlsx."
         )
+    return breakfasts, lunches, dinners
+
+def build_daily_plan(df, num_days=30):
+    """Rotate through the breakfast, lunch and dinner recipe costs to fill num_days"""
+    breakfasts, lunches, dinners = split_meal_categories(df)
 
     plan_rows = []
     for day in range(num_days):
@@ -37,10 +61,29 @@ def generate_daily_plan(recipe_costs_path, output_path, num_days=30):
             'dinner_cost': d['cost'],
             'total_cost': total
         })
-    plan_df = pd.DataFrame(plan_rows)
-    plan_df.to_excel(output_path, index=False)
+    return pd.DataFrame(plan_rows)
 
-if __name__ == "__main__":
-    input_path = os.path.join("output", "recipe_total_costs.xlsx")
+def build_daily_plan_vectorized(df, num_days=30):
+    """build_daily_plan with the rotation done as array indexing instead of one iloc per meal"""
+    breakfasts, lunches, dinners = split_meal_categories(df)
+    days = np.arange(num_days)
+    plan = {'day': days + 1}
+    total = np.zeros(num_days)
+    for meal_type, meals in (('breakfast', breakfasts), ('lunch', lunches), ('dinner', dinners)):
+        picks = days % len(meals)
+        plan[f'{meal_type}_name'] = meals['recipe_name'].to_numpy()[picks]
+        plan[f'{meal_type}_cost'] = meals['cost'].to_numpy()[picks]
+        total = total + plan[f'{meal_type}_cost']
+    plan['total_cost'] = total
+    return pd.DataFrame(plan)
+
+def main():
+    # Usage: python generate_daily_plan.py [--corpus]
+    # --corpus plans from every costed recipe of corpus_costs.py instead of the meal plan's
+    corpus = '--corpus' in sys.argv
+    input_path = CORPUS_COSTS_FILE if corpus else os.path.join("output", "recipe_total_costs.xlsx")
     output_path = os.path.join("output", "daily_plan.xlsx")
-    generate_daily_plan(input_path, output_path, num_days=30) 
\ No newline at end of file
+    generate_daily_plan(input_path, output_path, num_days=30, corpus=corpus)
+
+if __name__ == "__main__":
+    run_main(main, "generate_daily_plan") 
\ No newline at end of file
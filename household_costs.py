@@ -0,0 +1,103 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+from recipe_cost_vectors import RecipeCostModel, VECTORS_FILE
+from price_history import NET_MINIMUM_WAGE
+from stage_profiler import stage, run_main
+
+PROFILES_FILE = os.path.join("input_created", "household_profiles.json")
+
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+
+def load_profiles(path=PROFILES_FILE):
+    """
+    Load household profiles from JSON: a list of objects with 'name', 'size'
+    (people), optional 'recipe_servings', optional 'portion_multiplier' and optional
+    'skipped_meals' (meal types).
+
+    'recipe_servings' is how many people one recipe, as scraped, feeds. The scraped
+    recipes do not say, so it is an assumption of the profile. Without it the
+    household eats each recipe as written (recipe_servings = size), which is how the
+    published plan total is costed.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        profiles = pd.DataFrame(json.load(f))
+    if 'recipe_servings' not in profiles:
+        profiles['recipe_servings'] = np.nan
+    profiles['recipe_servings'] = profiles['recipe_servings'].fillna(profiles['size'])
+    if 'portion_multiplier' not in profiles:
+        profiles['portion_multiplier'] = 1.0
+    if 'skipped_meals' not in profiles:
+        profiles['skipped_meals'] = [[] for _ in range(len(profiles))]
+    profiles['portion_multiplier'] = profiles['portion_multiplier'].fillna(1.0)
+    profiles['skipped_meals'] = profiles['skipped_meals'].apply(lambda s: s if isinstance(s, list) else [])
+    return profiles
+
+def household_cost_matrix(model, profiles):
+    """
+    Cost the plan for every household profile at once.
+    Costs are linear in quantities, so scaling each recipe's quantity vector by
+    size * portion / recipe_servings scales its cost by the same factor. The whole
+    (households x days) matrix is one broadcast multiply and one matrix product.
+    """
+    meal_costs = model.meal_costs()
+    meal_types = sorted(set(MEAL_TYPES) | set(meal_costs['category']))
+    days = np.sort(meal_costs['day'].unique())
+
+    # (meal types x days) cost of each meal slot in the plan
+    slot_costs = meal_costs.pivot_table(index='category', columns='day', values='cost', aggfunc='sum', fill_value=0.0)
+    slot_costs = slot_costs.reindex(index=meal_types, columns=days, fill_value=0.0).to_numpy()
+
+    # (households x meal types) 1 when the household eats that meal
+    eats = np.array([[meal_type not in skipped for meal_type in meal_types] for skipped in profiles['skipped_meals']], dtype=float)
+    scale = (profiles['size'].to_numpy(dtype=float) * profiles['portion_multiplier'].to_numpy(dtype=float)
+             / profiles['recipe_servings'].to_numpy(dtype=float))
+
+    matrix = scale[:, None] * (eats @ slot_costs)
+    return pd.DataFrame(matrix, index=pd.Index(profiles['name'], name='household'), columns=pd.Index(days, name='day'))
+
+def summarize_households(matrix, profiles, minimum_wage=NET_MINIMUM_WAGE):
+    summary = pd.DataFrame({
+        'household': matrix.index,
+        'size': profiles['size'].to_numpy(),
+        'recipe_servings': profiles['recipe_servings'].to_numpy(),
+        'monthly_total': matrix.sum(axis=1).to_numpy(),
+        'average_daily_cost': matrix.mean(axis=1).to_numpy(),
+    })
+    summary['cost_per_person'] = summary['monthly_total'] / summary['size']
+    summary['minimum_wage_share'] = summary['monthly_total'] / minimum_wage * 100
+    return summary
+
+def main():
+    # Usage: python household_costs.py [profiles_file] [vectors_file]
+    profiles_file = sys.argv[1] if len(sys.argv) > 1 else PROFILES_FILE
+    vectors_file = sys.argv[2] if len(sys.argv) > 2 else VECTORS_FILE
+
+    if not os.path.exists(vectors_file):
+        print(f"No recipe cost vectors found at {vectors_file}. Run recipe_cost_vectors.py first.")
+        sys.exit(1)
+    model = RecipeCostModel.load(vectors_file)
+    profiles = load_profiles(profiles_file)
+    print(f"Costing {len(model.meals)} meals for {len(profiles)} household profiles...")
+
+    with stage("cost households"):
+        matrix = household_cost_matrix(model, profiles)
+    summary = summarize_households(matrix, profiles)
+
+    os.makedirs("output", exist_ok=True)
+    output_file = os.path.join("output", "household_costs.xlsx")
+    with stage("write excel"), pd.ExcelWriter(output_file) as writer:
+        summary.to_excel(writer, sheet_name="Summary", index=False)
+        matrix.to_excel(writer, sheet_name="Daily Costs")
+    print(f"Household costs saved to: {output_file}")
+
+    print("\n=== HOUSEHOLD MONTHLY COSTS ===")
+    for _, row in summary.head(20).iterrows():
+        print(f"{row['household']}: {row['monthly_total']:.2f} TL "
+              f"({row['cost_per_person']:.2f} TL per person, {row['minimum_wage_share']:.1f}% of minimum wage, "
+              f"recipes taken to serve {row['recipe_servings']:g})")
+
+if __name__ == "__main__":
+    run_main(main, "household_costs")
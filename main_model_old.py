@@ -2,78 +2,42 @@ import pandas as pd
 import json
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
 import os
 import sys
+from cost_coverage import CoverageTracker
+from compact_results import ResultsTable, save_compact, mark_compact_current, COMPACT_DIR
+from report_writer import ReportWriter
+from stage_profiler import stage, run_main
+from unit_registry import load_registry
+
+# Unit sizes, piece weights and liquids come from input_created/unit_registry.json
+UNITS = load_registry()
 
 # Kitchen unit conversions
-KITCHEN_UNIT_TO_GRAM = {
-    'yemek kaşığı': 15,
-    'tatlı kaşığı': 5,
-    'çay kaşığı': 2.5,
-    'su bardağı': 200,
-    'çay bardağı': 100,
-    'fincan': 65,
-    'avuç': 25,
-    'tutam': 2.5,
-    'kase': 200,  # Added for "kase" unit
-    'demet': 100,  # Added for "demet" unit
-    'baş': 50,    # Added for "baş" unit (e.g., sarımsak)
-    'diş': 5,     # Added for "diş" unit (e.g., sarımsak)
-    'paket': 10,  # Added for "paket" unit (e.g., kabartma tozu)
-}
-KITCHEN_UNIT_TO_ML = {
-    'yemek kaşığı': 15,
-    'tatlı kaşığı': 5,
-    'çay kaşığı': 2.5,
-    'su bardağı': 200,
-    'çay bardağı': 100,
-    'fincan': 65,
-}
-
-# Average weights (grams) for common vegetables/fruits sold as "adet"
-ADET_TO_GRAM = {
-    'domates': 150,  # medium tomato
-    'salatalık': 120,  # medium cucumber
-    'soğan': 130,  # medium onion
-    'patates': 150,  # medium potato
-    'biber': 40,  # medium pepper
-    'kapya biber': 100,  # large red pepper
-    'yeşil biber': 30,  # medium green pepper
-    'patlıcan': 200,  # medium eggplant
-    'elma': 180,  # medium apple
-    'portakal': 200,  # medium orange
-    'limon': 80,  # medium lemon
-    'muz': 120,  # medium banana
-    'yumurta': 60,  # medium egg
-    'lavaş': 100,  # one piece of lavash
-    'yufka': 50,   # one piece of yufka
-}
-
-# Known liquids (expand as needed)
-KNOWN_LIQUIDS = [
-    'su', 'süt', 'zeytinyağı', 'ayçiçek yağı', 'sıvı yağ', 'sıvıyağ', 'sirke', 'limon suyu', 'nar ekşisi', 'soda', 'sos', 'bal', 'pekmez', 'yoğurt', 'krema', 'salça', 'ketçap', 'mayonez', 'tereyağı', 'margarin'
-]
+KITCHEN_UNIT_TO_GRAM = UNITS.unit_grams
+KITCHEN_UNIT_TO_ML = UNITS.unit_ml
+
+# Average weights (grams) for vegetables/fruits sold as "adet"
+ADET_TO_GRAM = UNITS.piece_weights
+
+# Known liquids (expand in the registry file)
+KNOWN_LIQUIDS = UNITS.liquids
 
 # Ingredients that should be treated as solids even if they're in the liquids list
-SOLID_INGREDIENTS = [
-    'salça', 'tereyağı', 'margarin', 'bal', 'pekmez', 'yoğurt', 'krema'
-]
+SOLID_INGREDIENTS = UNITS.solids
 
 def convert_to_kg_or_lt(amount, unit, ingredient_name, price_unit=None):
-    # Handle empty units for common ingredients
+    converted_amount, final_unit = _convert_unit(amount, unit, ingredient_name, price_unit)
+    # Volumes priced by weight (or the other way round) go through the ingredient's density
+    return UNITS.convert_density(converted_amount, final_unit, ingredient_name, price_unit)
+
+def _convert_unit(amount, unit, ingredient_name, price_unit=None):
+    # Handle empty units for common ingredients (spices, herbs, cheese, liquids)
     if not unit:
-        if any(spice in ingredient_name for spice in ['tuz', 'karabiber', 'kırmızı pul biber', 'kırmızı toz biber', 'kekik', 'kimyon', 'nane']):
-            return 0.01, 'kg'  # Assume 10g for spices
-        elif 'maydanoz' in ingredient_name:
-            return 0.01, 'kg'  # Assume 10g for herbs
-        elif 'sarımsak' in ingredient_name:
-            return 0.01, 'kg'  # Assume 10g for garlic
-        elif 'peynir' in ingredient_name:
-            return 0.05, 'kg'  # Assume 50g for cheese
-        elif any(liquid in ingredient_name for liquid in KNOWN_LIQUIDS):
-            if any(solid in ingredient_name for solid in SOLID_INGREDIENTS):
-                return 0.05, 'kg'  # Treat as solid
-            return 0.1, 'lt'  # Assume 100ml for liquids
+        unitless = UNITS.ingredient_info(ingredient_name)[1]
+        if unitless is not None:
+            return unitless
         return None, unit
 
     # Handle kitchen units
@@ -98,11 +62,11 @@ def convert_to_kg_or_lt(amount, unit, ingredient_name, price_unit=None):
             return amount, 'adet'
         elif price_unit == 'kg':
             # Try to convert adet to kg using average weight
-            for key, avg_weight in ADET_TO_GRAM.items():
-                if key in ingredient_name:
-                    grams = amount * avg_weight
-                    return grams / 1000, 'kg'
-            return None, unit  # cannot convert if not in dictionary
+            avg_weight = UNITS.piece_grams(ingredient_name)
+            if not np.isnan(avg_weight):
+                grams = amount * avg_weight
+                return grams / 1000, 'kg'
+            return None, unit  # cannot convert if not in the registry
         else:
             return None, unit
     else:
@@ -133,6 +97,149 @@ def calculate_cost(recipe_amount, recipe_unit, price, price_amount, price_unit,
     except Exception as e:
         return None, converted_amount, final_unit, f"calculation error: {str(e)}"
 
+SIMILARITY_THRESHOLD = 0.7
+
+def load_price_data(ingredients_file):
+    """Load the ingredient price sheet and add the cleaned name column used for matching"""
+    price_df = pd.read_excel(ingredients_file, usecols=["Ingredient", "price", "amount", "unit"])
+    price_df['Ingredient_clean'] = price_df['Ingredient'].str.lower().str.strip()
+    return price_df
+
+def build_matcher(price_df):
+    """Fit the TF-IDF vectorizer on the price catalog once and vectorize the catalog"""
+    vectorizer = TfidfVectorizer().fit(list(price_df['Ingredient_clean']))
+    price_vecs = vectorizer.transform(price_df['Ingredient_clean'])
+    return vectorizer, price_vecs
+
+MATCH_BATCH_ROWS = 5000
+
+def match_ingredients(ing_texts, vectorizer, price_vecs, batch_rows=MATCH_BATCH_ROWS):
+    """
+    Match a batch of ingredient texts against the price catalog.
+    Returns (best_idx, best_score) arrays with one entry per text.
+    The dense similarity matrix is built batch_rows texts at a time, so large corpora
+    never hold more than batch_rows x catalog similarities in memory.
+    """
+    text_vecs = vectorizer.transform(ing_texts)
+    best_idx = np.empty(text_vecs.shape[0], dtype=np.intp)
+    best_score = np.empty(text_vecs.shape[0])
+    for start in range(0, text_vecs.shape[0], batch_rows):
+        sims = cosine_similarity(text_vecs[start:start + batch_rows], price_vecs)
+        idx = sims.argmax(axis=1)
+        best_idx[start:start + len(idx)] = idx
+        best_score[start:start + len(idx)] = sims[np.arange(len(idx)), idx]
+    return best_idx, best_score
+
+def cost_matched_ingredient(ing_text, ing_amount, ing_unit, price_df, best_idx, best_score):
+    """
+    Cost one ingredient given its best catalog match.
+    Returns the per-ingredient columns of the results table, from 'meal_ingredient' to 'debug_issue'.
+    """
+    if best_score >= SIMILARITY_THRESHOLD:
+        matched_row = price_df.iloc[best_idx]
+        price = matched_row['price']
+        price_amount = matched_row['amount']
+        price_unit = matched_row['unit'].strip().lower()
+        cost, converted_amount, final_unit, debug_reason = calculate_cost(
+            ing_amount, ing_unit, price, price_amount, price_unit, ing_text)
+        match_status = "Matched"
+    else:
+        matched_row = None
+        price = None
+        price_amount = None
+        price_unit = None
+        cost = None
+        converted_amount = None
+        final_unit = None
+        match_status = "Not found"
+        debug_reason = "no good match (low similarity)"
+    return {
+        'meal_ingredient': ing_text,
+        'matched_ingredient': matched_row['Ingredient'] if matched_row is not None else None,
+        'score': best_score,
+        'recipe_amount': ing_amount,
+        'recipe_unit': ing_unit,
+        'price': price,
+        'price_amount': price_amount,
+        'price_unit': price_unit,
+        'converted_amount': converted_amount,
+        'final_unit': final_unit,
+        'cost': cost,
+        'match_status': match_status,
+        'debug_issue': debug_reason
+    }
+
+def recipe_key(recipe):
+    """Name plus ingredients, so an edited recipe is re-costed even when its name stays the same"""
+    name = recipe.get('name', recipe.get('title', 'Unknown Recipe'))
+    return name, json.dumps(recipe.get('ingredients', []), ensure_ascii=False, sort_keys=True)
+
+def iter_recipe_ingredients(recipe):
+    """Yield (ing_text, ing_amount, ing_unit) for every ingredient line of a recipe"""
+    for ingredient in recipe.get('ingredients', []):
+        ing_text = ingredient.get('text', '').strip().lower()
+        if not ing_text:
+            continue
+        ing_amount = ingredient.get('amount', 1)
+        ing_unit = ingredient.get('unit', '').strip().lower()
+        yield ing_text, ing_amount, ing_unit
+
+def iter_plan_ingredients(meal_plan):
+    """Yield (day, meal_type, recipe_name, ing_text, ing_amount, ing_unit) for every ingredient in the plan"""
+    for day_obj in meal_plan:
+        day = day_obj.get('day')
+        for meal_type, recipe in day_obj.items():
+            if meal_type == 'day':
+                continue
+            if not recipe or not isinstance(recipe, dict):
+                continue
+            recipe_name = recipe.get('name', recipe.get('title', 'Unknown Recipe'))
+            for ing_text, ing_amount, ing_unit in iter_recipe_ingredients(recipe):
+                yield day, meal_type, recipe_name, ing_text, ing_amount, ing_unit
+
+def build_cost_basis(meal_plan, price_df, vectorizer=None, price_vecs=None):
+    """
+    Match and convert every ingredient of the plan once, without pricing it.
+    Returns one row per ingredient line. 'price_idx' is the matched price row
+    (-1 when the line cannot be costed) and 'converted_amount' is the quantity
+    in that row's unit, so cost = converted_amount * price / price_amount.
+    """
+    lines = pd.DataFrame(
+        list(iter_plan_ingredients(meal_plan)),
+        columns=['day', 'category', 'recipe_name', 'meal_ingredient', 'recipe_amount', 'recipe_unit']
+    )
+    return match_and_convert(lines, price_df, vectorizer, price_vecs)
+
+def match_and_convert(lines, price_df, vectorizer=None, price_vecs=None):
+    """
+    Add 'score', 'price_idx' and 'converted_amount' to a frame of ingredient lines
+    ('meal_ingredient', 'recipe_amount', 'recipe_unit'), as build_cost_basis describes.
+    """
+    if vectorizer is None or price_vecs is None:
+        vectorizer, price_vecs = build_matcher(price_df)
+    lines = lines.copy()
+    if lines.empty:
+        return lines.assign(score=pd.Series(dtype=float), price_idx=pd.Series(dtype=int),
+                            converted_amount=pd.Series(dtype=float))
+
+    # Match each distinct ingredient text only once
+    unique_texts = lines['meal_ingredient'].unique()
+    best_idx, best_score = match_ingredients(list(unique_texts), vectorizer, price_vecs)
+    text_pos = pd.Index(unique_texts).get_indexer(lines['meal_ingredient'])
+    lines['score'] = best_score[text_pos]
+    matched_idx = np.where(lines['score'] >= SIMILARITY_THRESHOLD, best_idx[text_pos], -1)
+
+    # Convert each matched line into the unit of its price row with the compiled registry tables
+    price_units = price_df['unit'].str.strip().str.lower().to_numpy(dtype=object)
+    line_price_units = np.where(matched_idx >= 0, price_units[np.maximum(matched_idx, 0)], '')
+    converted, final_units = UNITS.convert_many(
+        lines['recipe_amount'].to_numpy(dtype=float), list(lines['recipe_unit']),
+        list(lines['meal_ingredient']), line_price_units)
+    costable = (matched_idx >= 0) & ~np.isnan(converted) & (final_units == line_price_units)
+    lines['price_idx'] = np.where(costable, matched_idx, -1)
+    lines['converted_amount'] = np.where(costable, converted, np.nan)
+    return lines
+
 def main():
     print("Starting cost calculation process...")
     # Default file names
@@ -146,95 +253,80 @@ def main():
     print(f"Using ingredients file: {ingredients_file}")
     # Load the DataFrame from the ingredients Excel file
     print("Loading ingredient price data...")
-    price_df = pd.read_excel(ingredients_file, usecols=["Ingredient", "price", "amount", "unit"])
-    price_df['Ingredient_clean'] = price_df['Ingredient'].str.lower().str.strip()
+    with stage("load prices"):
+        price_df = load_price_data(ingredients_file)
     print(f"Loaded {len(price_df)} ingredients with prices")
+    with stage("fit matcher"):
+        vectorizer, price_vecs = build_matcher(price_df)
 
     # Load meal plan from the provided JSON file
     print("\nLoading meal plan data...")
-    with open(meal_plan_file, 'r', encoding='utf-8') as f:
+    with stage("load meal plan"), open(meal_plan_file, 'r', encoding='utf-8') as f:
         meal_plan_json = json.load(f)
     meal_plan = meal_plan_json['meal_plan']  # This is a list of days
     print(f"Loaded meal plan with {len(meal_plan)} days")
 
-    results = []
+    results = ResultsTable()
     debug_log = []
-    SIMILARITY_THRESHOLD = 0.7
+    coverage = CoverageTracker()
 
     print("\nProcessing meals and calculating costs...")
-    for day_obj in meal_plan:
-        day = day_obj.get('day')
-        print(f"\nProcessing day: {day}")
-        for meal_type, recipe in day_obj.items():
-            if meal_type == 'day':
-                continue
-            if not recipe or not isinstance(recipe, dict):
-                continue
-            recipe_name = recipe.get('name', recipe.get('title', 'Unknown Recipe'))
-            print(f"  Processing {meal_type}: {recipe_name}")
-            for ingredient in recipe.get('ingredients', []):
-                ing_text = ingredient.get('text', '').strip().lower()
-                ing_amount = ingredient.get('amount', 1)
-                ing_unit = ingredient.get('unit', '').strip().lower()
-                if not ing_text:
+    with stage("cost ingredients"):
+        for day_obj in meal_plan:
+            day = day_obj.get('day')
+            print(f"\nProcessing day: {day}")
+            for meal_type, recipe in day_obj.items():
+                if meal_type == 'day':
+                    continue
+                if not recipe or not isinstance(recipe, dict):
                     continue
-                # TF-IDF match
-                vectorizer = TfidfVectorizer().fit(list(price_df['Ingredient_clean']))
-                price_vecs = vectorizer.transform(price_df['Ingredient_clean'])
-                ing_vec = vectorizer.transform([ing_text])
-                sims = cosine_similarity(ing_vec, price_vecs).flatten()
-                best_idx = sims.argmax()
-                best_score = sims[best_idx]
-                if best_score >= SIMILARITY_THRESHOLD:
-                    matched_row = price_df.iloc[best_idx]
-                    price = matched_row['price']
-                    price_amount = matched_row['amount']
-                    price_unit = matched_row['unit'].strip().lower()
-                    cost, converted_amount, final_unit, debug_reason = calculate_cost(
-                        ing_amount, ing_unit, price, price_amount, price_unit, ing_text)
-                    match_status = "Matched"
-                else:
-                    matched_row = None
-                    price = None
-                    price_amount = None
-                    price_unit = None
-                    cost = None
-                    converted_amount = None
-                    final_unit = None
-                    match_status = "Not found"
-                    debug_reason = "no good match (low similarity)"
-                result = {
-                    'day': day,
-                    'category': meal_type,
-                    'recipe_name': recipe_name,
-                    'meal_ingredient': ing_text,
-                    'matched_ingredient': matched_row['Ingredient'] if matched_row is not None else None,
-                    'score': best_score,
-                    'recipe_amount': ing_amount,
-                    'recipe_unit': ing_unit,
-                    'price': price,
-                    'price_amount': price_amount,
-                    'price_unit': price_unit,
-                    'converted_amount': converted_amount,
-                    'final_unit': final_unit,
-                    'cost': cost,
-                    'match_status': match_status,
-                    'debug_issue': debug_reason
-                }
-                results.append(result)
-                if cost is None:
-                    debug_log.append(result)
+                recipe_name = recipe.get('name', recipe.get('title', 'Unknown Recipe'))
+                print(f"  Processing {meal_type}: {recipe_name}")
+                for ingredient in recipe.get('ingredients', []):
+                    ing_text = ingredient.get('text', '').strip().lower()
+                    ing_amount = ingredient.get('amount', 1)
+                    ing_unit = ingredient.get('unit', '').strip().lower()
+                    if not ing_text:
+                        continue
+                    # TF-IDF match
+                    best_idx, best_score = match_ingredients([ing_text], vectorizer, price_vecs)
+                    best_idx = best_idx[0]
+                    best_score = best_score[0]
+                    result = {
+                        'day': day,
+                        'category': meal_type,
+                        'recipe_name': recipe_name,
+                        **cost_matched_ingredient(ing_text, ing_amount, ing_unit, price_df, best_idx, best_score)
+                    }
+                    results.append(result)
+                    coverage.add(result)
+                    if result['cost'] is None:
+                        debug_log.append(result)
 
     print(f"\nProcessed {len(results)} ingredients in total")
     print(f"Found {len(debug_log)} ingredients with missing costs")
+    coverage.print_summary()
 
-    results_df = pd.DataFrame(results)
+    results_df = results.to_frame()
     os.makedirs("output", exist_ok=True)
+    # The compact copy is what the downstream scripts read, so it is written first
+    with stage("write compact"):
+        save_compact(results_df, COMPACT_DIR)
+    print(f"\nCompact results saved to: {COMPACT_DIR}")
     output_file = os.path.join("output", "meal_plan_with_calculated_costs.xlsx")
-    results_df.to_excel(output_file, index=False)
-    print(f"\nResults saved to: {output_file}")
+    with stage("write excel"):
+        # Streams rows to disk and continues on a new sheet past Excel's row limit
+        writer = ReportWriter(output_file)
+        try:
+            writer.write_frame("Sheet1", results_df)
+        finally:
+            writer.close()
+    mark_compact_current(COMPACT_DIR)
+    print(f"Results saved to: {output_file}")
+    report_file = coverage.write_report()
+    print(f"Coverage report saved to: {report_file}")
 
     print("\nProcessing complete!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run_main(main, "main_model_old") 
\ No newline at end of file
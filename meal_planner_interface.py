@@ -6,6 +6,13 @@ import pandas as pd
 from datetime import datetime
 from PIL import Image, ImageTk
 import shutil
+import queue
+import json
+import threading
+from recipe_cost_vectors import RecipeCostModel
+from results_viewer import show_results
+from thumbnail_cache import ThumbnailCache
+from compact_results import read_costed_results
 
 class MealPlannerInterface:
     def __init__(self, root):
@@ -63,6 +70,14 @@ class MealPlannerInterface:
         # Initialize file paths
         self.meal_plan_path = None
         self.ingredients_path = None
+
+        # Plot thumbnails are kept across visualization windows
+        self.thumbnails = ThumbnailCache()
+
+        # Watch mode runs watch_costs.py in the background and streams its summaries
+        self.watch_process = None
+        self.watch_updates = queue.Queue()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def center_window(self, width, height):
         screen_width = self.root.winfo_screenwidth()
@@ -106,6 +121,17 @@ class MealPlannerInterface:
         self.view_results_btn.grid(row=0, column=3, padx=12, pady=7, sticky="ew")
         self.view_plots_btn = ttk.Button(process_frame, text="View Visualizations", command=self.view_visualizations)
         self.view_plots_btn.grid(row=0, column=4, padx=12, pady=7, sticky="ew")
+        self.what_if_btn = ttk.Button(process_frame, text="What-If Prices", command=self.open_price_what_if)
+        self.what_if_btn.grid(row=1, column=0, padx=12, pady=7, sticky="ew")
+        self.watch_var = tk.BooleanVar(value=False)
+        self.watch_check = ttk.Checkbutton(process_frame, text="Watch Inputs", variable=self.watch_var, command=self.toggle_watch)
+        self.watch_check.grid(row=1, column=1, padx=12, pady=7, sticky="w")
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(process_frame, text="Profile Runs", variable=self.profile_var).grid(row=1, column=2, padx=12, pady=7, sticky="w")
+        self.export_report_btn = ttk.Button(process_frame, text="Export Report", command=self.export_report)
+        self.export_report_btn.grid(row=1, column=3, padx=12, pady=7, sticky="ew")
+        self.corpus_costs_btn = ttk.Button(process_frame, text="Cost All Recipes", command=self.run_corpus_costs)
+        self.corpus_costs_btn.grid(row=1, column=4, padx=12, pady=7, sticky="ew")
     
     def create_output_section(self, bg_frame, fg_text):
         # Output text area
@@ -153,7 +179,7 @@ class MealPlannerInterface:
             self.root.update()
             
             # Run the cost calculation script
-            result = subprocess.run(['python', 'calculate_daily_costs.py'], 
+            result = subprocess.run(['python', 'calculate_daily_costs.py'] + self.profile_args(), 
                                  capture_output=True, text=True)
             
             if result.returncode == 0:
@@ -182,7 +208,7 @@ class MealPlannerInterface:
             self.root.update()
             
             # Run the daily plan generation script
-            result = subprocess.run(['python', 'generate_daily_plan.py'], 
+            result = subprocess.run(['python', 'generate_daily_plan.py'] + self.profile_args(), 
                                  capture_output=True, text=True)
             
             if result.returncode == 0:
@@ -199,6 +225,31 @@ class MealPlannerInterface:
             self.status_var.set("Error")
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
+    def export_report(self):
+        try:
+            self.status_var.set("Exporting report...")
+            self.output_text.delete(1.0, tk.END)
+            self.output_text.insert(tk.END, "Exporting report...\n")
+            self.root.update()
+            
+            # Write all deliverables into one workbook
+            result = subprocess.run(['python', 'report_exporter.py'] + self.profile_args(), 
+                                 capture_output=True, text=True)
+            
+            if result.returncode == 0:
+                self.output_text.insert(tk.END, result.stdout)
+                self.status_var.set("Report export completed")
+                messagebox.showinfo("Success", "Report exported successfully!")
+            else:
+                self.output_text.insert(tk.END, f"Error: {result.stderr}")
+                self.status_var.set("Error in report export")
+                messagebox.showerror("Error", "Failed to export report")
+        
+        except Exception as e:
+            self.output_text.insert(tk.END, f"Error: {str(e)}")
+            self.status_var.set("Error")
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+    
     def view_visualizations(self):
         plots_dir = os.path.join("output", "plots")
         if not os.path.exists(plots_dir):
@@ -221,40 +272,79 @@ class MealPlannerInterface:
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
 
-        row = 0
-        for plot_file in sorted(os.listdir(plots_dir)):
-            if plot_file.endswith('.png'):
-                plot_frame = ttk.LabelFrame(scrollable_frame, text=plot_file.replace('.png', '').replace('_', ' ').title(), padding=10)
-                plot_frame.grid(row=row, column=0, padx=20, pady=10, sticky="ew")
-
+        # Lay out every plot with a placeholder, then fill in thumbnails as the workers finish
+        placeholders = {}
+        plot_files = [f for f in sorted(os.listdir(plots_dir)) if f.endswith('.png')]
+        for row, plot_file in enumerate(plot_files):
+            image_path = os.path.join(plots_dir, plot_file)
+            plot_frame = ttk.LabelFrame(scrollable_frame, text=plot_file.replace('.png', '').replace('_', ' ').title(), padding=10)
+            plot_frame.grid(row=row, column=0, padx=20, pady=10, sticky="ew")
+
+            placeholder = ttk.Label(plot_frame, text="Loading...")
+            placeholder.pack(padx=5, pady=5)
+            placeholders[image_path] = placeholder
+
+            button_frame = ttk.Frame(plot_frame)
+            button_frame.pack(pady=5)
+            ttk.Button(button_frame, text="View Full Size",
+                       command=lambda p=image_path: self.show_full_image(p)).pack(side=tk.LEFT, padx=5)
+
+            # Save As button
+            def save_as(img_path=image_path):
+                file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")])
+                if file_path:
+                    shutil.copy(img_path, file_path)
+            ttk.Button(button_frame, text="Save As PNG", command=save_as).pack(side=tk.LEFT, padx=5)
+
+        loaded = self.thumbnails.load_async(placeholders)
+
+        def show_loaded():
+            if not plots_window.winfo_exists():
+                return
+            while True:
                 try:
-                    image_path = os.path.join(plots_dir, plot_file)
-                    image = Image.open(image_path)
-                    max_width = 700
-                    if image.width > max_width:
-                        ratio = max_width / image.width
-                        image = image.resize((max_width, int(image.height * ratio)), Image.Resampling.LANCZOS)
-                    photo = ImageTk.PhotoImage(image)
-                    label = ttk.Label(plot_frame, image=photo)
-                    label.image = photo
-                    label.pack(padx=5, pady=5)
-
-                    # Save As button
-                    def save_as(img_path=image_path):
-                        file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")])
-                        if file_path:
-                            shutil.copy(img_path, file_path)
-                    ttk.Button(plot_frame, text="Save As PNG", command=save_as).pack(pady=5)
-
-                except Exception as e:
-                    ttk.Label(plot_frame, text=f"Error loading plot: {str(e)}").pack()
-
-                row += 1
+                    image_path, image, error = loaded.get_nowait()
+                except queue.Empty:
+                    break
+                label = placeholders.pop(image_path)
+                if error is not None:
+                    label.configure(text=f"Error loading plot: {str(error)}")
+                    continue
+                photo = ImageTk.PhotoImage(image)
+                label.configure(image=photo, text="")
+                label.image = photo
+            if placeholders:
+                plots_window.after(50, show_loaded)
+
+        show_loaded()
 
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
         ttk.Button(plots_window, text="Close", command=plots_window.destroy).pack(pady=5)
 
+    def show_full_image(self, image_path):
+        try:
+            image = Image.open(image_path)
+            photo = ImageTk.PhotoImage(image)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading plot: {str(e)}")
+            return
+
+        image_window = tk.Toplevel(self.root)
+        image_window.title(os.path.basename(image_path))
+        image_window.geometry("1000x750")
+
+        canvas = tk.Canvas(image_window, bg="#f8fffa", scrollregion=(0, 0, photo.width(), photo.height()))
+        y_scrollbar = ttk.Scrollbar(image_window, orient="vertical", command=canvas.yview)
+        x_scrollbar = ttk.Scrollbar(image_window, orient="horizontal", command=canvas.xview)
+        canvas.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        canvas.create_image(0, 0, image=photo, anchor="nw")
+        canvas.image = photo
+
+        y_scrollbar.pack(side="right", fill="y")
+        x_scrollbar.pack(side="bottom", fill="x")
+        canvas.pack(side="left", fill="both", expand=True)
+
     def view_results(self):
         output_dir = "output"
         if not os.path.exists(output_dir):
@@ -276,14 +366,196 @@ class MealPlannerInterface:
             file_listbox.insert(tk.END, file)
 
         # Add open button
-        def open_file():
+        def open_file(event=None):
             selected = file_listbox.curselection()
             if selected:
                 file = file_listbox.get(selected[0])
-                os.startfile(os.path.join(output_dir, file))
+                show_results(self.root, os.path.join(output_dir, file))
 
+        file_listbox.bind("<Double-Button-1>", open_file)
         ttk.Button(results_window, text="Open Selected File", command=open_file).pack(pady=5)
 
+    def load_cost_model(self):
+        results_file = os.path.join("output", "meal_plan_with_calculated_costs.xlsx")
+        vectors_file = os.path.join("output", "recipe_cost_vectors.json")
+        ingredients_path = self.ingredients_entry.get()
+        # Reuse the stored vectors unless a newer costing run has replaced the results, or
+        # they were built from another price sheet or before the selected one was edited
+        if os.path.exists(vectors_file) and (
+                not os.path.exists(results_file) or os.path.getmtime(vectors_file) >= os.path.getmtime(results_file)):
+            model = RecipeCostModel.load(vectors_file)
+            if not ingredients_path or not os.path.exists(ingredients_path) or model.built_from(ingredients_path):
+                return model
+        if not os.path.exists(results_file) or not ingredients_path:
+            return None
+        price_df = pd.read_excel(ingredients_path, usecols=["Ingredient", "price", "amount", "unit"])
+        model = RecipeCostModel.from_results(read_costed_results(results_file), price_df)
+        model.save(vectors_file, ingredients_path)
+        return model
+
+    def open_price_what_if(self):
+        try:
+            model = self.load_cost_model()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load recipe costs: {str(e)}")
+            return
+        if model is None:
+            messagebox.showerror("Error", "No costed ingredients found. Please select the ingredients file and run ingredient cost calculation first.")
+            return
+
+        what_if_window = tk.Toplevel(self.root)
+        what_if_window.title("What-If Prices")
+        what_if_window.geometry("750x550")
+
+        edit_frame = ttk.LabelFrame(what_if_window, text="Change Price", padding=12)
+        edit_frame.pack(fill=tk.X, padx=10, pady=10)
+
+        ttk.Label(edit_frame, text="Ingredient:").grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        ingredient_var = tk.StringVar()
+        ingredient_box = ttk.Combobox(edit_frame, textvariable=ingredient_var, values=sorted(model.used_ingredients()),
+                                      state="readonly", width=30)
+        ingredient_box.grid(row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(edit_frame, text="Price (TL):").grid(row=0, column=2, sticky="w", padx=5, pady=5)
+        price_var = tk.StringVar()
+        price_entry = ttk.Entry(edit_frame, textvariable=price_var, width=12)
+        price_entry.grid(row=0, column=3, padx=5, pady=5)
+
+        current_var = tk.StringVar()
+        ttk.Label(edit_frame, textvariable=current_var).grid(row=1, column=0, columnspan=4, sticky="w", padx=5)
+
+        summary_var = tk.StringVar()
+        ttk.Label(what_if_window, textvariable=summary_var, font=("Helvetica", 12, "bold")).pack(fill=tk.X, padx=10)
+
+        columns = ("recipe", "base_cost", "new_cost", "change")
+        tree = ttk.Treeview(what_if_window, columns=columns, show="headings")
+        for column, heading, width in zip(columns, ("Recipe", "Base Cost (TL)", "New Cost (TL)", "Change (TL)"), (300, 130, 130, 110)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w" if column == "recipe" else "e")
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        base_recipe_costs = model.recipe_costs()
+        base_total = model.baseline_monthly_total()
+
+        def refresh():
+            total = model.monthly_total()
+            summary_var.set(f"Monthly total: {total:.2f} TL (base {base_total:.2f} TL, change {total - base_total:+.2f} TL)"
+                            f"   Average daily: {model.daily_costs().mean():.2f} TL")
+            tree.delete(*tree.get_children())
+            changes = (model.recipe_costs() - base_recipe_costs)
+            for recipe in changes[changes.abs() > 1e-9].abs().sort_values(ascending=False).index:
+                tree.insert("", tk.END, values=(recipe, f"{base_recipe_costs[recipe]:.2f}",
+                                                f"{model.recipe_costs()[recipe]:.2f}", f"{changes[recipe]:+.2f}"))
+
+        def show_current(event=None):
+            idx = model.find_ingredient(ingredient_var.get())
+            row = model.price_df.iloc[idx]
+            current_var.set(f"Catalog price: {row['price']:.2f} TL per {row['amount']} {row['unit']}")
+            price_var.set(f"{model.unit_prices[idx] * row['amount']:.2f}")
+
+        def apply_price(event=None):
+            if not ingredient_var.get():
+                return
+            try:
+                price = float(price_var.get().replace(',', '.'))
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid price", parent=what_if_window)
+                return
+            model.set_price(ingredient_var.get(), price)
+            refresh()
+
+        def reset_prices():
+            model.reset_prices()
+            if ingredient_var.get():
+                show_current()
+            refresh()
+
+        ingredient_box.bind("<<ComboboxSelected>>", show_current)
+        price_entry.bind("<Return>", apply_price)
+        ttk.Button(edit_frame, text="Apply", command=apply_price).grid(row=0, column=4, padx=5, pady=5)
+        ttk.Button(edit_frame, text="Reset All", command=reset_prices).grid(row=0, column=5, padx=5, pady=5)
+        ttk.Button(what_if_window, text="Close", command=what_if_window.destroy).pack(pady=5)
+        refresh()
+
+    def profile_args(self):
+        """Extra arguments that make a pipeline script write its profile to output/profiles"""
+        return ['--profile'] if self.profile_var.get() else []
+
+    def toggle_watch(self):
+        if not self.watch_var.get():
+            self.stop_watch()
+            self.status_var.set("Stopped watching inputs")
+            return
+        meal_plan_path = self.meal_plan_entry.get()
+        ingredients_path = self.ingredients_entry.get()
+        if not meal_plan_path or not ingredients_path:
+            self.watch_var.set(False)
+            messagebox.showerror("Error", "Please select both meal plan and ingredients files")
+            return
+
+        # stderr shares the pipe so a crash's traceback shows up in the output pane
+        self.watch_process = subprocess.Popen(
+            ['python', 'watch_costs.py', meal_plan_path, ingredients_path, '--json'],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8'
+        )
+        self.watch_updates = queue.Queue()
+
+        def read_updates(process=self.watch_process, updates=self.watch_updates):
+            for line in process.stdout:
+                updates.put(line)
+            # End of output: the watcher has exited
+            updates.put(None)
+
+        threading.Thread(target=read_updates, daemon=True).start()
+        self.output_text.delete(1.0, tk.END)
+        self.output_text.insert(tk.END, f"Watching {meal_plan_path} and {ingredients_path} for changes...\n")
+        self.status_var.set("Watching inputs")
+        self.show_watch_updates()
+
+    def show_watch_updates(self):
+        finished = False
+        while True:
+            try:
+                line = self.watch_updates.get_nowait()
+            except queue.Empty:
+                break
+            if line is None:
+                finished = True
+                break
+            try:
+                summary = json.loads(line)
+            except ValueError:
+                self.output_text.insert(tk.END, line)
+                continue
+            self.output_text.insert(tk.END, (
+                f"[{summary['updated_at']}] {summary.get('trigger', 'initial costing')}: "
+                f"monthly total {summary['monthly_total']:.2f} TL, "
+                f"average daily {summary['average_daily_cost']:.2f} TL, "
+                f"changed days {summary.get('changed_days', [])}\n"
+            ))
+            self.output_text.see(tk.END)
+            self.status_var.set(f"Watching inputs - monthly total {summary['monthly_total']:.2f} TL")
+        if self.watch_process is None:
+            return
+        if finished:
+            returncode = self.watch_process.wait()
+            self.watch_process = None
+            self.watch_var.set(False)
+            self.output_text.insert(tk.END, f"\nWatcher exited with code {returncode}\n")
+            self.output_text.see(tk.END)
+            self.status_var.set("Watch mode stopped" if returncode == 0 else f"Watch mode stopped (exit code {returncode})")
+            return
+        self.root.after(100, self.show_watch_updates)
+
+    def stop_watch(self):
+        if self.watch_process is not None:
+            self.watch_process.terminate()
+            self.watch_process = None
+
+    def on_close(self):
+        self.stop_watch()
+        self.root.destroy()
+
     def run_main_model_old(self):
         try:
             self.status_var.set("Running ingredient cost calculation...")
@@ -303,7 +575,7 @@ class MealPlannerInterface:
                 'python', 'main_model_old.py',
                 meal_plan_path,
                 ingredients_path
-            ], capture_output=True, text=True)
+            ] + self.profile_args(), capture_output=True, text=True)
 
             if result.returncode == 0:
                 self.output_text.insert(tk.END, result.stdout)
@@ -319,6 +591,42 @@ class MealPlannerInterface:
             self.status_var.set("Error")
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
+    def run_corpus_costs(self):
+        try:
+            self.status_var.set("Costing all recipes...")
+            self.output_text.delete(1.0, tk.END)
+            self.output_text.insert(tk.END, "Costing all recipes...\n")
+            self.root.update()
+
+            meal_plan_path = self.meal_plan_entry.get()
+            ingredients_path = self.ingredients_entry.get()
+            if not meal_plan_path or not ingredients_path:
+                self.output_text.insert(tk.END, "Please select both meal plan and ingredients files.\n")
+                self.status_var.set("Error: Missing file paths")
+                messagebox.showerror("Error", "Please select both meal plan and ingredients files.")
+                return
+
+            # Cost every scraped recipe, not only the ones in the plan
+            result = subprocess.run([
+                'python', 'corpus_costs.py',
+                meal_plan_path,
+                ingredients_path
+            ] + self.profile_args(), capture_output=True, text=True)
+
+            if result.returncode == 0:
+                self.output_text.insert(tk.END, result.stdout)
+                self.status_var.set("Recipe costing completed")
+                messagebox.showinfo("Success", "All recipes costed successfully!")
+            else:
+                self.output_text.insert(tk.END, f"Error: {result.stderr}")
+                self.status_var.set("Error in recipe costing")
+                messagebox.showerror("Error", "Failed to cost all recipes")
+
+        except Exception as e:
+            self.output_text.insert(tk.END, f"Error: {str(e)}")
+            self.status_var.set("Error")
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
 def main():
     root = tk.Tk()
     app = MealPlannerInterface(root)
@@ -0,0 +1,132 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+import matplotlib.pyplot as plt
+import seaborn as sns
+from price_history import NET_MINIMUM_WAGE
+from corpus_costs import CORPUS_COSTS_FILE
+from stage_profiler import stage, run_main
+
+PERCENTILES = [5, 25, 50, 75, 95]
+CHUNK_SAMPLES = 10000
+
+def load_recipe_pools(meal_plan_file, recipe_costs_file):
+    """
+    Return (breakfast_costs, main_course_costs) arrays for the recipe pools of meal_plan.json.
+    Pools are deduplicated by recipe name so a plan never repeats a dish until the pool runs out.
+    """
+    with open(meal_plan_file, 'r', encoding='utf-8') as f:
+        meal_plan_json = json.load(f)
+    recipe_costs = pd.read_excel(recipe_costs_file)
+    costs_by_name = recipe_costs.drop_duplicates('recipe_name').set_index('recipe_name')['cost']
+
+    pools = []
+    for key in ('breakfast_recipes', 'main_course_recipes'):
+        names = pd.Index([r.get('name', r.get('title')) for r in meal_plan_json[key]]).unique()
+        costs = costs_by_name.reindex(names)
+        if costs.isna().any():
+            print(f"Warning: {costs.isna().sum()} {key} have no cost and are left out of the pool")
+        pools.append(costs.dropna().to_numpy(dtype=float))
+    return pools[0], pools[1]
+
+def sample_pool_indices(rng, pool_size, days, per_day, samples):
+    """
+    Draw recipe indices for many plans at once, following create_meal_plan: picks are
+    without replacement and the pool is refilled (dropping leftovers) once fewer than
+    per_day recipes remain. Returns an int array of shape (samples, days * per_day).
+    """
+    days_per_pool = pool_size // per_day
+    if days_per_pool == 0:
+        raise ValueError(f"Need at least {per_day} recipes in the pool, found {pool_size}")
+    blocks = []
+    remaining = days
+    while remaining > 0:
+        block_days = min(days_per_pool, remaining)
+        # Each row of argsort over uniform noise is an independent random permutation
+        permutations = np.argsort(rng.random((samples, pool_size)), axis=1)
+        blocks.append(permutations[:, :block_days * per_day])
+        remaining -= block_days
+    return np.concatenate(blocks, axis=1)
+
+def sample_monthly_totals(breakfast_costs, main_course_costs, samples=50000, days=30, seed=42):
+    """Monthly totals of `samples` random no-repeat plans (1 breakfast, lunch and dinner per day)"""
+    rng = np.random.default_rng(seed)
+    totals = np.empty(samples)
+    for start in range(0, samples, CHUNK_SAMPLES):
+        count = min(CHUNK_SAMPLES, samples - start)
+        breakfasts = sample_pool_indices(rng, len(breakfast_costs), days, 1, count)
+        main_courses = sample_pool_indices(rng, len(main_course_costs), days, 2, count)
+        totals[start:start + count] = breakfast_costs[breakfasts].sum(axis=1) + main_course_costs[main_courses].sum(axis=1)
+    return totals
+
+def summarize_totals(totals, budget_share=0.5, minimum_wage=NET_MINIMUM_WAGE):
+    """Percentiles of the monthly totals and the probability of passing budget_share of the minimum wage"""
+    budget = minimum_wage * budget_share
+    summary = {
+        'samples': len(totals),
+        'mean': totals.mean(),
+        'std': totals.std(),
+        'min': totals.min(),
+        'max': totals.max(),
+    }
+    for percentile, value in zip(PERCENTILES, np.percentile(totals, PERCENTILES)):
+        summary[f'p{percentile}'] = value
+    summary['mean_minimum_wage_share'] = totals.mean() / minimum_wage * 100
+    summary['budget'] = budget
+    summary['probability_over_budget'] = (totals > budget).mean()
+    return summary
+
+def plot_distribution(totals, budget, plots_dir=os.path.join("output", "plots")):
+    os.makedirs(plots_dir, exist_ok=True)
+    sns.set_theme()
+    colorblind_palette = sns.color_palette('colorblind')
+    plt.figure(figsize=(10, 6))
+    plt.hist(totals, bins=60, color=colorblind_palette[0])
+    plt.axvline(x=budget, color=colorblind_palette[1], linestyle='--', label='Budget')
+    plt.title('Monthly Cost Distribution of Random Meal Plans', fontsize=14, pad=15)
+    plt.xlabel('Monthly Cost (TL)', fontsize=12)
+    plt.ylabel('Plans', fontsize=12)
+    plt.legend(fontsize=10)
+    plt.tight_layout()
+    plot_file = os.path.join(plots_dir, 'monthly_cost_distribution.png')
+    plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+    plt.close()
+    return plot_file
+
+def main():
+    # Usage: python monte_carlo_plans.py [meal_plan_file] [samples] [seed] [budget_share]
+    meal_plan_file = sys.argv[1] if len(sys.argv) > 1 else 'meal_plan.json'
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    budget_share = float(sys.argv[4]) if len(sys.argv) > 4 else 0.5
+    # The corpus table prices every pool recipe; the plan's table only those it happened to use
+    recipe_costs_file = CORPUS_COSTS_FILE
+    if not os.path.exists(recipe_costs_file):
+        recipe_costs_file = os.path.join("output", "recipe_total_costs.xlsx")
+        print(f"{CORPUS_COSTS_FILE} not found, run corpus_costs.py to cost the whole pool")
+
+    with stage("load pools"):
+        breakfast_costs, main_course_costs = load_recipe_pools(meal_plan_file, recipe_costs_file)
+    print(f"Sampling {samples} plans from {len(breakfast_costs)} breakfasts and {len(main_course_costs)} main courses...")
+    with stage("sample plans"):
+        totals = sample_monthly_totals(breakfast_costs, main_course_costs, samples=samples, seed=seed)
+    summary = summarize_totals(totals, budget_share)
+
+    output_file = os.path.join("output", "monte_carlo_costs.xlsx")
+    pd.DataFrame([summary]).to_excel(output_file, index=False)
+    with stage("plot"):
+        plot_file = plot_distribution(totals, summary['budget'])
+
+    print("\n=== MONTHLY COST DISTRIBUTION ===")
+    print(f"Mean: {summary['mean']:.2f} TL ({summary['mean_minimum_wage_share']:.1f}% of minimum wage)")
+    for percentile in PERCENTILES:
+        print(f"P{percentile}: {summary[f'p{percentile}']:.2f} TL")
+    print(f"Probability of exceeding {budget_share * 100:.0f}% of minimum wage "
+          f"({summary['budget']:.2f} TL): {summary['probability_over_budget'] * 100:.2f}%")
+    print(f"\nSummary saved to: {output_file}")
+    print(f"Distribution plot saved to: {plot_file}")
+
+if __name__ == "__main__":
+    run_main(main, "monte_carlo_plans")
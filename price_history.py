@@ -0,0 +1,140 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+from scipy import sparse
+from main_model_old import load_price_data, build_cost_basis
+from stage_profiler import stage, run_main
+
+HISTORY_FILE = os.path.join("input_created", "price_history.xlsx")
+PRICE_COLUMNS = ["Ingredient", "price", "amount", "unit"]
+
+# Net minimum wage used for the comparison in the README (January 2025)
+NET_MINIMUM_WAGE = 22104
+
+def load_price_history(history_file=HISTORY_FILE):
+    """Load all dated price snapshots as one long table"""
+    if not os.path.exists(history_file):
+        return pd.DataFrame(columns=PRICE_COLUMNS + ['date'])
+    history = pd.read_excel(history_file, usecols=PRICE_COLUMNS + ['date'])
+    history['date'] = pd.to_datetime(history['date'])
+    return history
+
+def add_price_snapshot(ingredients_file, snapshot_date, history_file=HISTORY_FILE):
+    """Store the current price sheet as the snapshot for snapshot_date, replacing any earlier one for that date"""
+    snapshot = pd.read_excel(ingredients_file, usecols=PRICE_COLUMNS)
+    snapshot_date = pd.Timestamp(snapshot_date).normalize()
+    snapshot['date'] = snapshot_date
+
+    history = load_price_history(history_file)
+    history = history[history['date'] != snapshot_date]
+    history = pd.concat([history, snapshot], ignore_index=True)
+    history = history.sort_values(['date', 'Ingredient']).reset_index(drop=True)
+
+    os.makedirs(os.path.dirname(history_file) or ".", exist_ok=True)
+    history.to_excel(history_file, index=False)
+    print(f"Saved {len(snapshot)} prices for {snapshot_date.date()} to {history_file}")
+    return history
+
+def build_unit_price_matrix(price_df, history):
+    """
+    Align every snapshot with the rows of price_df.
+    Returns (matrix, dates) where matrix[i, j] is the price per unit of price row i
+    on dates[j]. Ingredients missing from a snapshot keep their last known price;
+    a row whose unit differs from the catalog unit is never used.
+    """
+    history = history.copy()
+    history['Ingredient_clean'] = history['Ingredient'].str.lower().str.strip()
+    history['unit'] = history['unit'].str.strip().str.lower()
+    history['unit_price'] = history['price'] / history['amount'].replace(0, np.nan)
+
+    pivot = history.pivot_table(index=['Ingredient_clean', 'unit'], columns='date',
+                                values='unit_price', aggfunc='last')
+    pivot = pivot.sort_index(axis=1).ffill(axis=1)
+
+    keys = pd.MultiIndex.from_arrays([price_df['Ingredient_clean'], price_df['unit'].str.strip().str.lower()])
+    matrix = pivot.reindex(keys).to_numpy(dtype=float)
+    return matrix, list(pivot.columns)
+
+def recost_plan(meal_plan, price_df, history):
+    """
+    Cost the same meal plan against every price snapshot in one pass.
+    Matching and unit conversion are done once; each date only changes the price vector,
+    so the (days x dates) cost table is a single sparse matrix product.
+    """
+    basis = build_cost_basis(meal_plan, price_df)
+    unit_prices, dates = build_unit_price_matrix(price_df, history)
+
+    costed = basis[basis['price_idx'] >= 0]
+    days = pd.Index(sorted(basis['day'].unique()))
+
+    # (days x price rows) matrix holding the converted quantity each day uses of each priced item
+    quantities = sparse.csr_matrix(
+        (costed['converted_amount'].to_numpy(),
+         (days.get_indexer(costed['day']), costed['price_idx'].to_numpy())),
+        shape=(len(days), len(price_df))
+    )
+
+    # Items absent from a snapshot contribute nothing, like the missing costs in calculate_meal_costs
+    used_rows = np.unique(costed['price_idx'])
+    missing = np.isnan(unit_prices[used_rows]).sum(axis=0)
+    daily_costs = quantities @ np.nan_to_num(unit_prices, nan=0.0)
+
+    daily_df = pd.DataFrame(daily_costs, index=days, columns=dates)
+    daily_df.index.name = 'day'
+
+    summary = pd.DataFrame({
+        'date': dates,
+        'monthly_total': daily_costs.sum(axis=0),
+        'average_daily_cost': daily_costs.mean(axis=0),
+        'missing_prices': missing,
+    })
+    summary['minimum_wage_share'] = summary['monthly_total'] / NET_MINIMUM_WAGE * 100
+    return daily_df, summary
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('add', 'recost'):
+        print("Usage:")
+        print("  python price_history.py add <ingredients_file> <YYYY-MM-DD> [history_file]")
+        print("  python price_history.py recost <meal_plan_file> <ingredients_file> [history_file]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'add':
+        history_file = sys.argv[4] if len(sys.argv) > 4 else HISTORY_FILE
+        add_price_snapshot(sys.argv[2], sys.argv[3], history_file)
+        return
+
+    meal_plan_file = sys.argv[2]
+    ingredients_file = sys.argv[3]
+    history_file = sys.argv[4] if len(sys.argv) > 4 else HISTORY_FILE
+
+    print("Loading price history...")
+    history = load_price_history(history_file)
+    if history.empty:
+        print(f"No price snapshots found in {history_file}")
+        sys.exit(1)
+    print(f"Loaded {history['date'].nunique()} price snapshots")
+
+    price_df = load_price_data(ingredients_file)
+    with open(meal_plan_file, 'r', encoding='utf-8') as f:
+        meal_plan = json.load(f)['meal_plan']
+
+    print("Re-costing meal plan across all snapshots...")
+    with stage("recost plan"):
+        daily_df, summary = recost_plan(meal_plan, price_df, history)
+
+    os.makedirs("output", exist_ok=True)
+    output_file = os.path.join("output", "plan_cost_by_date.xlsx")
+    with pd.ExcelWriter(output_file) as writer:
+        summary.to_excel(writer, sheet_name="Summary", index=False)
+        daily_df.rename(columns=lambda d: d.strftime('%Y-%m-%d')).to_excel(writer, sheet_name="Daily Costs")
+    print(f"Results saved to: {output_file}")
+
+    print("\n=== MONTHLY COST BY PRICE DATE ===")
+    for _, row in summary.iterrows():
+        print(f"{row['date'].date()}: {row['monthly_total']:.2f} TL "
+              f"({row['minimum_wage_share']:.1f}% of minimum wage)")
+
+if __name__ == "__main__":
+    run_main(main, "price_history")
@@ -0,0 +1,246 @@
+from bs4 import BeautifulSoup
+import pandas as pd
+import json
+import os
+import re
+import sys
+from urllib.parse import quote, urljoin
+from recipes_vbg_2 import fetch_pages, CACHE_DIR
+from stage_profiler import run_main
+
+BASE_URL = "https://www.cimri.com"
+SEARCH_PATH = "/arama?q={query}"
+
+# Pack size units mapped to the kg / lt / adet units of the price sheet
+PACK_UNITS = {
+    'kg': (1, 'kg'), 'kilo': (1, 'kg'), 'gram': (0.001, 'kg'), 'gr': (0.001, 'kg'), 'g': (0.001, 'kg'),
+    'litre': (1, 'lt'), 'lt': (1, 'lt'), 'l': (1, 'lt'), 'ml': (0.001, 'lt'), 'cl': (0.01, 'lt'),
+    'adet': (1, 'adet'),
+}
+_NUMBER = r"\d+(?:[.,]\d+)?"
+# "2x1 L", "500 g" and weight ranges such as "63-72 g"
+PACK_PATTERN = re.compile(
+    rf"(?:(?P<count>\d+)\s*[x×]\s*)?(?:(?P<low>{_NUMBER})\s*[-–]\s*)?(?P<size>{_NUMBER})\s*"
+    r"(?P<unit>" + "|".join(sorted(PACK_UNITS, key=len, reverse=True)) + r")(?![a-zçğıöşü])"
+)
+# "6'lı", "30'lu", "10 lu" style piece counts
+COUNT_PATTERN = re.compile(r"(\d+)\s*['’]?\s*(?:lı|li|lu|lü)(?![a-zçğıöşü])")
+# Produce sold by weight is often listed as just "Domates Kg"
+BARE_UNIT_PATTERN = re.compile(r"(?<![a-zçğıöşü])(kg|adet)(?![a-zçğıöşü])")
+
+# CSS fallbacks for listings without JSON-LD data
+CARD_SELECTORS = ["article", "div[class*='product']", "li[class*='product']"]
+TITLE_SELECTORS = ["h3", "h2", "[class*='title']", "[class*='name']"]
+PRICE_SELECTORS = ["[class*='price']", "[class*='Price']"]
+
+def lower_tr(text):
+    """Lowercase with the Turkish dotted/dotless I rules"""
+    return text.replace('İ', 'i').replace('I', 'ı').lower()
+
+def parse_price(text):
+    """Parse a price such as '1.234,56 TL' or '49,90 ₺' into a float"""
+    match = re.search(r"\d[\d.,]*", text or "")
+    if not match:
+        return None
+    number = match.group().rstrip('.,')
+    if ',' in number:
+        number = number.replace('.', '').replace(',', '.')
+    elif re.fullmatch(r"\d{1,3}(?:\.\d{3})+", number):
+        number = number.replace('.', '')
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+def parse_pack_size(title):
+    """
+    Read the pack size from a product title.
+    Returns (amount, unit) in the price sheet units, e.g. '500 g' -> (0.5, 'kg'),
+    '2x1 L' -> (2, 'lt'), "6'lı 330 ml" -> (1.98, 'lt'), "6'lı" -> (6, 'adet'),
+    or (None, None) if there is no size. A size range such as "30'lu 63-72 g"
+    counts at its midpoint (30 x 67.5 g).
+    """
+    title = lower_tr(title)
+    match = PACK_PATTERN.search(title)
+    count_match = COUNT_PATTERN.search(title)
+    if match:
+        # A multipack is priced for all of its items: "2x1 L" or "6'lı ... 330 ml"
+        if match.group('count'):
+            count = int(match.group('count'))
+        else:
+            count = int(count_match.group(1)) if count_match else 1
+        size = float(match.group('size').replace(',', '.'))
+        if match.group('low'):
+            size = (float(match.group('low').replace(',', '.')) + size) / 2
+        factor, unit = PACK_UNITS[match.group('unit')]
+        return round(count * size * factor, 6), unit
+    if count_match:
+        return float(count_match.group(1)), 'adet'
+    match = BARE_UNIT_PATTERN.search(title)
+    if match:
+        return 1.0, match.group(1)
+    return None, None
+
+def _json_ld_products(data):
+    """Yield (title, price, url) from schema.org Product / ItemList data"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_products(item)
+        return
+    if not isinstance(data, dict):
+        return
+    if '@graph' in data:
+        yield from _json_ld_products(data['@graph'])
+    if data.get('@type') == 'ItemList':
+        for element in data.get('itemListElement', []):
+            yield from _json_ld_products(element.get('item', element) if isinstance(element, dict) else element)
+    if data.get('@type') == 'Product':
+        offers = data.get('offers', {})
+        if isinstance(offers, list):
+            offers = offers[0] if offers else {}
+        price = offers.get('price', offers.get('lowPrice'))
+        yield data.get('name'), parse_price(str(price)) if price is not None else None, data.get('url')
+
+def parse_product_listing(html, page_url=BASE_URL):
+    """Parse a search or category page into a list of {title, price, url} dicts"""
+    soup = BeautifulSoup(html, 'html.parser')
+    products = []
+
+    for script in soup.select('script[type="application/ld+json"]'):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for title, price, url in _json_ld_products(data):
+            if title and price is not None:
+                products.append({'title': title.strip(), 'price': price, 'url': urljoin(page_url, url or '')})
+    if products:
+        return products
+
+    for card_selector in CARD_SELECTORS:
+        cards = []
+        for card in soup.select(card_selector):
+            title = next((card.select_one(s) for s in TITLE_SELECTORS if card.select_one(s)), None)
+            price = next((card.select_one(s) for s in PRICE_SELECTORS if card.select_one(s)), None)
+            if title and price:
+                cards.append((card, title, price))
+        # A "product-list" container matches the same selector as its "product-card"s;
+        # only the innermost cards are products
+        containers = {id(parent) for card, _, _ in cards for parent in card.parents}
+        for card, title, price in cards:
+            if id(card) in containers:
+                continue
+            link = card.select_one('a[href]')
+            products.append({
+                'title': title.get_text(" ", strip=True),
+                'price': parse_price(price.get_text(" ", strip=True)),
+                'url': urljoin(page_url, link['href']) if link else page_url
+            })
+        if products:
+            break
+    return [p for p in products if p['price'] is not None]
+
+def normalize_products(products, ingredient):
+    """Turn parsed products into rows of the price/amount/unit schema used by calculate_cost"""
+    rows = []
+    for product in products:
+        amount, unit = parse_pack_size(product['title'])
+        if amount is None or not amount:
+            continue
+        rows.append({
+            'Ingredient': ingredient,
+            'product': product['title'],
+            'price': product['price'],
+            'amount': amount,
+            'unit': unit,
+            'unit_price': product['price'] / amount,
+            'url': product['url']
+        })
+    return rows
+
+def search_url(ingredient, base_url=BASE_URL):
+    return urljoin(base_url, SEARCH_PATH.format(query=quote(ingredient)))
+
+def scrape_prices(ingredients, base_url=BASE_URL, cache_dir=CACHE_DIR, max_workers=8, refresh=True):
+    """
+    Fetch the listing page of every ingredient concurrently and return all normalized offers.
+    Listings are downloaded again by default since prices change; refresh=False reuses the
+    cached pages of the last run.
+    """
+    urls = {ingredient: search_url(ingredient, base_url) for ingredient in ingredients}
+    pages = fetch_pages(list(urls.values()), cache_dir=cache_dir, max_workers=max_workers, refresh=refresh)
+
+    rows = []
+    for ingredient, url in urls.items():
+        html = pages.get(url)
+        if html:
+            rows.extend(normalize_products(parse_product_listing(html, url), ingredient))
+    return pd.DataFrame(rows, columns=['Ingredient', 'product', 'price', 'amount', 'unit', 'unit_price', 'url'])
+
+def select_offers(offers):
+    """
+    Pick one offer per ingredient.
+    Only offers whose title contains every word of the ingredient are used, and the one
+    closest to the median unit price is picked so single outliers do not set the price.
+    """
+    selected = []
+    for ingredient, group in offers.groupby('Ingredient', sort=False):
+        words = lower_tr(ingredient).split()
+        group = group[group['product'].apply(lambda t: all(w in lower_tr(t) for w in words))]
+        if group.empty:
+            continue
+        # Keep the most common unit so kg and adet offers are not compared
+        group = group[group['unit'] == group['unit'].mode().iloc[0]]
+        median = group['unit_price'].median()
+        selected.append(group.loc[(group['unit_price'] - median).abs().idxmin()])
+    return pd.DataFrame(selected, columns=offers.columns).reset_index(drop=True)
+
+def load_into_catalog(selected, ingredients_file, output_file=None):
+    """Update matching rows of the price sheet and append new ingredients, then save it"""
+    catalog = pd.read_excel(ingredients_file)
+    keys = catalog['Ingredient'].str.lower().str.strip()
+    updates = selected.assign(key=selected['Ingredient'].str.lower().str.strip()).set_index('key')
+
+    known = keys.isin(updates.index)
+    # Whole-number prices and amounts read back from Excel as integers
+    catalog[['price', 'amount']] = catalog[['price', 'amount']].astype(float)
+    for column in ['price', 'amount', 'unit']:
+        catalog.loc[known, column] = updates.loc[keys[known], column].to_numpy()
+
+    new_rows = updates[~updates.index.isin(keys)][['Ingredient', 'price', 'amount', 'unit']]
+    catalog = pd.concat([catalog, new_rows], ignore_index=True)
+
+    output_file = output_file or ingredients_file
+    catalog.to_excel(output_file, index=False)
+    print(f"Updated {int(known.sum())} prices and added {len(new_rows)} ingredients in {output_file}")
+    return catalog
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) < 1:
+        print("Usage: python price_scraper.py <ingredients_file> [base_url] [output_file] [--cached]")
+        sys.exit(1)
+    ingredients_file = args[0]
+    base_url = args[1] if len(args) > 1 else BASE_URL
+    output_file = args[2] if len(args) > 2 else ingredients_file
+    # --cached reuses the listings of the last run instead of downloading current prices
+    refresh = '--cached' not in sys.argv
+
+    ingredients = pd.read_excel(ingredients_file, usecols=["Ingredient"])['Ingredient'].dropna().unique()
+    print(f"Fetching prices for {len(ingredients)} ingredients from {base_url}"
+          f"{' (cached listings)' if not refresh else ''}...")
+    offers = scrape_prices(ingredients, base_url, refresh=refresh)
+    print(f"Parsed {len(offers)} offers with a known pack size")
+
+    os.makedirs("output", exist_ok=True)
+    offers_file = os.path.join("output", "scraped_prices.xlsx")
+    offers.to_excel(offers_file, index=False)
+    print(f"All offers saved to: {offers_file}")
+
+    if offers.empty:
+        print("No prices found, price sheet left unchanged")
+        return
+    load_into_catalog(select_offers(offers), ingredients_file, output_file)
+
+if __name__ == "__main__":
+    run_main(main, "price_scraper")
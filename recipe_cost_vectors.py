@@ -0,0 +1,193 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+from scipy import sparse
+from compact_results import read_costed_results, RESULTS_FILE
+from stage_profiler import stage, run_main
+
+VECTORS_FILE = os.path.join("output", "recipe_cost_vectors.json")
+
+def ingredients_stamp(ingredients_file):
+    """Absolute path and modification time of a price sheet, stored with the vectors built from it"""
+    return {'path': os.path.abspath(ingredients_file), 'mtime': os.path.getmtime(ingredients_file)}
+
+class RecipeCostModel:
+    """
+    Recipe, daily and monthly costs as linear functions of the ingredient unit prices.
+    Each recipe is stored as a sparse vector of (price row, converted quantity), so a
+    price edit only touches the recipes that use that row.
+    """
+    def __init__(self, price_df, recipe_names, recipe_vectors, meals):
+        self.price_df = price_df[['Ingredient', 'price', 'amount', 'unit']].reset_index(drop=True)
+        self.ingredient_keys = self.price_df['Ingredient'].str.lower().str.strip()
+        self.recipe_names = list(recipe_names)
+        # ingredients_stamp() of the price sheet the vectors were built from, when known
+        self.ingredients_file = None
+        self.recipe_vectors = sparse.csr_matrix(recipe_vectors)
+        self._recipe_columns = self.recipe_vectors.tocsc()
+
+        self.meals = meals[['day', 'category', 'recipe_name']].reset_index(drop=True)
+        self._meal_recipe = pd.Index(self.recipe_names).get_indexer(self.meals['recipe_name'])
+        self.days, self._meal_day = np.unique(self.meals['day'].to_numpy(), return_inverse=True)
+
+        amounts = self.price_df['amount'].to_numpy(dtype=float)
+        self.base_unit_prices = self.price_df['price'].to_numpy(dtype=float) / np.where(amounts == 0, np.nan, amounts)
+        self.base_unit_prices = np.nan_to_num(self.base_unit_prices, nan=0.0)
+        self.reset_prices()
+
+    @classmethod
+    def from_basis(cls, basis, price_df):
+        """Build the model from main_model_old.build_cost_basis output"""
+        meals = basis[['day', 'category', 'recipe_name']].drop_duplicates()
+        return cls._from_lines(basis[basis['price_idx'] >= 0], price_df, meals)
+
+    @classmethod
+    def from_results(cls, results_df, price_df):
+        """Build the model from the costed ingredient table written by main_model_old.py"""
+        meals = results_df[['day', 'category', 'recipe_name']].drop_duplicates()
+        costed = results_df[results_df['cost'].notna()].copy()
+        # Duplicate catalog names resolve to the first row, the same one argmax picks when matching
+        first_row = pd.Series(np.arange(len(price_df)), index=price_df['Ingredient'])
+        first_row = first_row[~first_row.index.duplicated()]
+        costed['price_idx'] = first_row.reindex(costed['matched_ingredient']).to_numpy()
+        costed = costed[costed['price_idx'].notna()]
+        return cls._from_lines(costed, price_df, meals)
+
+    @classmethod
+    def _from_lines(cls, lines, price_df, meals):
+        # Every occurrence of a recipe has the same ingredients, so keep the first meal only
+        first_meal = meals.drop_duplicates('recipe_name')
+        lines = lines.merge(first_meal, on=['day', 'category', 'recipe_name'])
+        recipe_names = list(meals['recipe_name'].drop_duplicates())
+        vectors = sparse.csr_matrix(
+            (lines['converted_amount'].to_numpy(dtype=float),
+             (pd.Index(recipe_names).get_indexer(lines['recipe_name']), lines['price_idx'].to_numpy(dtype=int))),
+            shape=(len(recipe_names), len(price_df))
+        )
+        return cls(price_df, recipe_names, vectors, meals)
+
+    def save(self, path=VECTORS_FILE, ingredients_file=None):
+        """
+        Save the prices, recipe vectors and plan to JSON so the model loads without Excel.
+        ingredients_file is the price sheet the model was built from; its path and
+        modification time are stored so a later edit or a different sheet can be detected.
+        """
+        if ingredients_file:
+            self.ingredients_file = ingredients_stamp(ingredients_file)
+        vectors = {}
+        for i, name in enumerate(self.recipe_names):
+            row = self.recipe_vectors.getrow(i)
+            vectors[name] = [[int(idx), float(qty)] for idx, qty in zip(row.indices, row.data)]
+        data = {
+            'prices': self.price_df.to_dict(orient='records'),
+            'recipes': vectors,
+            'meals': self.meals.to_dict(orient='records'),
+            'ingredients_file': self.ingredients_file
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=lambda x: x.item())
+
+    @classmethod
+    def load(cls, path=VECTORS_FILE):
+        """Load a model written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        price_df = pd.DataFrame(data['prices'])
+        recipe_names = list(data['recipes'])
+        rows, cols, values = [], [], []
+        for i, name in enumerate(recipe_names):
+            for idx, qty in data['recipes'][name]:
+                rows.append(i)
+                cols.append(idx)
+                values.append(qty)
+        vectors = sparse.csr_matrix((values, (rows, cols)), shape=(len(recipe_names), len(price_df)))
+        model = cls(price_df, recipe_names, vectors, pd.DataFrame(data['meals']))
+        model.ingredients_file = data.get('ingredients_file')
+        return model
+
+    def built_from(self, ingredients_file):
+        """True when the model was built from this price sheet and the sheet has not changed since"""
+        return self.ingredients_file is not None and self.ingredients_file == ingredients_stamp(ingredients_file)
+
+    def find_ingredient(self, ingredient):
+        """Return the price row index for an ingredient name (case-insensitive)"""
+        matches = np.flatnonzero(self.ingredient_keys == ingredient.lower().strip())
+        if len(matches) == 0:
+            raise KeyError(f"Ingredient not in price catalog: {ingredient}")
+        return int(matches[0])
+
+    def used_ingredients(self):
+        """Names of the price rows that at least one recipe uses"""
+        used = np.unique(self.recipe_vectors.indices)
+        return list(self.price_df['Ingredient'].iloc[used])
+
+    def set_price(self, ingredient, price, amount=None):
+        """Change the price of one ingredient and update the affected recipe costs in place"""
+        idx = self.find_ingredient(ingredient)
+        if amount is None:
+            amount = self.price_df.at[idx, 'amount']
+        self.set_row_price(idx, price, amount)
+        self.price_overrides[self.price_df.at[idx, 'Ingredient']] = (price, amount)
+
+    def set_row_price(self, idx, price, amount):
+        """Change the price of one catalog row. Returns the indices of the recipes whose cost changed"""
+        new_unit_price = price / amount if amount else 0.0
+        delta = new_unit_price - self.unit_prices[idx]
+        if not delta:
+            return np.empty(0, dtype=int)
+        column = self._recipe_columns.getcol(idx)
+        self._recipe_costs[column.indices] += column.data * delta
+        self.unit_prices[idx] = new_unit_price
+        return column.indices
+
+    def set_prices(self, changes):
+        """Apply several price edits given as {ingredient: price}"""
+        for ingredient, price in changes.items():
+            self.set_price(ingredient, price)
+
+    def reset_prices(self):
+        """Go back to the prices from the catalog"""
+        self.unit_prices = self.base_unit_prices.copy()
+        self._recipe_costs = self.recipe_vectors @ self.unit_prices
+        self.price_overrides = {}
+
+    def recipe_costs(self):
+        return pd.Series(self._recipe_costs, index=self.recipe_names, name='cost')
+
+    def meal_costs(self):
+        meal_costs = self.meals.copy()
+        meal_costs['cost'] = self._recipe_costs[self._meal_recipe]
+        return meal_costs
+
+    def daily_costs(self):
+        daily = np.bincount(self._meal_day, weights=self._recipe_costs[self._meal_recipe], minlength=len(self.days))
+        return pd.Series(daily, index=pd.Index(self.days, name='day'), name='Total Daily Cost')
+
+    def monthly_total(self):
+        return float(self._recipe_costs[self._meal_recipe].sum())
+
+    def baseline_monthly_total(self):
+        return float((self.recipe_vectors @ self.base_unit_prices)[self._meal_recipe].sum())
+
+def main():
+    # Build the vectors from the costed table of the last main_model_old.py run
+    ingredients_file = sys.argv[1] if len(sys.argv) > 1 else 'unique_ingredients2.xlsx'
+    results_file = sys.argv[2] if len(sys.argv) > 2 else RESULTS_FILE
+
+    print(f"Loading costed ingredients from: {results_file}")
+    with stage("load results"):
+        results_df = read_costed_results(results_file)
+        price_df = pd.read_excel(ingredients_file, usecols=["Ingredient", "price", "amount", "unit"])
+
+    with stage("build vectors"):
+        model = RecipeCostModel.from_results(results_df, price_df)
+    with stage("save vectors"):
+        model.save(VECTORS_FILE, ingredients_file)
+    print(f"Saved cost vectors for {len(model.recipe_names)} recipes to: {VECTORS_FILE}")
+    print(f"Total monthly cost: {model.monthly_total():.2f} TL")
+
+if __name__ == "__main__":
+    run_main(main, "recipe_cost_vectors")
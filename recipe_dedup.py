@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import sys
+from collections import defaultdict
+from urllib.parse import urlparse, unquote
+import numpy as np
+from unique_ingredients_2 import clean_ingredient
+from stage_profiler import run_main
+
+CLUSTERS_FILE = os.path.join("output", "recipe_clusters.json")
+NUM_PERM = 128
+BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 Jaccard almost always share a bucket
+JACCARD_THRESHOLD = 0.8
+MERSENNE_PRIME = (1 << 31) - 1
+# A band bucket this large holds no near-duplicate group worth the quadratic pair count
+MAX_BUCKET = 200
+
+def recipe_slug(url):
+    """Last part of a recipe URL, e.g. 'kabartma-tozlu-omlet'"""
+    return unquote(urlparse(url).path.rstrip('/').split('/')[-1])
+
+def ingredient_set(recipe):
+    """Cleaned ingredient names of a recipe, without amounts, units or section headers"""
+    cleaned = (clean_ingredient(i.get('text', '')) for i in recipe.get('ingredients', []))
+    return frozenset(c for c in cleaned if c)
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+
+def minhash_signatures(sets, num_perm=NUM_PERM, seed=1):
+    """(len(sets) x num_perm) MinHash signatures using (a * h + b) mod p permutations"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.int64)
+    b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.int64)
+    signatures = np.full((len(sets), num_perm), MERSENNE_PRIME, dtype=np.int64)
+    for i, tokens in enumerate(sets):
+        if not tokens:
+            continue
+        hashes = np.array([_token_hash(t) for t in tokens], dtype=np.int64) % MERSENNE_PRIME
+        signatures[i] = ((hashes[:, None] * a + b) % MERSENNE_PRIME).min(axis=0)
+    return signatures
+
+def candidate_pairs(signatures, bands=BANDS, max_bucket=MAX_BUCKET):
+    """
+    Pairs of rows whose signatures agree on at least one full band.
+    Buckets with more than max_bucket rows are skipped instead of paired all-to-all.
+    """
+    rows_per_band = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        band_values = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        for i, key in enumerate(map(bytes, band_values)):
+            buckets[key].append(i)
+        for members in buckets.values():
+            if len(members) > max_bucket:
+                continue
+            for j in range(1, len(members)):
+                for k in range(j):
+                    pairs.add((members[k], members[j]))
+    return pairs
+
+def cluster_recipes(recipes, threshold=JACCARD_THRESHOLD, num_perm=NUM_PERM, bands=BANDS):
+    """
+    Group near-duplicate recipes by their cleaned ingredient sets.
+    LSH candidates are confirmed with the exact Jaccard similarity and merged with
+    union-find. Returns one cluster id per recipe; the id is the index of the
+    cluster's canonical (first seen) recipe.
+    """
+    sets = [ingredient_set(r) for r in recipes]
+    # Recipes without ingredients would all share one signature; they stay on their own
+    rows = [i for i, tokens in enumerate(sets) if tokens]
+    signatures = minhash_signatures([sets[i] for i in rows], num_perm)
+    parent = list(range(len(recipes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in candidate_pairs(signatures, bands):
+        i, j = rows[a], rows[b]
+        if len(sets[i] & sets[j]) / len(sets[i] | sets[j]) >= threshold:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+    return [find(i) for i in range(len(recipes))]
+
+def dedupe_recipes(recipes, threshold=JACCARD_THRESHOLD):
+    """Return (canonical_recipes, clusters) where clusters maps canonical slug -> member slugs"""
+    cluster_ids = cluster_recipes(recipes, threshold)
+    clusters = defaultdict(list)
+    for recipe, cluster_id in zip(recipes, cluster_ids):
+        clusters[recipe_slug(recipes[cluster_id].get('url', ''))].append(recipe_slug(recipe.get('url', '')))
+    canonical = [recipe for i, recipe in enumerate(recipes) if cluster_ids[i] == i]
+    return canonical, dict(clusters)
+
+def save_clusters(clusters, path=CLUSTERS_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(clusters, f, ensure_ascii=False, indent=2)
+
+def load_duplicate_slugs(path=CLUSTERS_FILE):
+    """Slugs already known to be non-canonical members of a cluster, which need no scraping"""
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8') as f:
+        clusters = json.load(f)
+    return {slug for canonical, members in clusters.items() for slug in members if slug != canonical}
+
+def filter_known_duplicates(links, duplicate_slugs):
+    """Drop recipe links whose slug is a known duplicate of an already scraped recipe"""
+    return [link for link in links if recipe_slug(link['url']) not in duplicate_slugs]
+
+def main():
+    # Usage: python recipe_dedup.py [meal_plan_file] [threshold]
+    meal_plan_file = sys.argv[1] if len(sys.argv) > 1 else 'meal_plan.json'
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else JACCARD_THRESHOLD
+    with open(meal_plan_file, 'r', encoding='utf-8') as f:
+        meal_plan_json = json.load(f)
+
+    # Recipes scraped twice (e.g. under two categories) are only compared once
+    recipes = {}
+    for key in ('breakfast_recipes', 'main_course_recipes'):
+        for recipe in meal_plan_json.get(key, []):
+            recipes.setdefault(recipe.get('url') or recipe.get('name'), recipe)
+    recipes = list(recipes.values())
+
+    canonical, clusters = dedupe_recipes(recipes, threshold)
+    save_clusters(clusters)
+    print(f"{len(recipes)} recipes form {len(canonical)} clusters at Jaccard >= {threshold}")
+    for canonical_slug, members in clusters.items():
+        if len(members) > 1:
+            print(f"  {canonical_slug}: {', '.join(m for m in members if m != canonical_slug)}")
+    print(f"Clusters saved to: {CLUSTERS_FILE}")
+
+if __name__ == "__main__":
+    run_main(main, "recipe_dedup")
@@ -4,8 +4,201 @@ import json
 import os
 import re
 import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, unquote
 import random
+import sys
+import xml.etree.ElementTree as ET
+from recipe_dedup import load_duplicate_slugs, filter_known_duplicates
+from stage_profiler import run_main
+from unit_registry import load_registry
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+CACHE_DIR = os.path.join("cache", "pages")
+BASE_URL = "https://ye-mek.net"
+SITEMAP_CACHE_DIR = os.path.join("cache", "sitemaps")
+SITEMAP_STATE_FILE = os.path.join("cache", "sitemap_state.json")
+BREAKFAST_CATEGORIES = ('kahvaltiliklar', 'kahvalti-tarifleri')
+MAIN_COURSE_CATEGORIES = ('ana-yemek-tarifleri', 'et-yemekleri', 'sebze-yemekleri')
+
+def fetch_page(url, cache_dir=CACHE_DIR, refresh=False):
+    """Fetch a page as text, reusing the on-disk copy under cache_dir when there is one"""
+    cache_file = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_file = os.path.join(cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html')
+        if not refresh and os.path.exists(cache_file):
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return f.read()
+
+    response = requests.get(url, headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    response.encoding = 'utf-8'  # Ensure proper Turkish character encoding
+    text = response.text
+
+    if cache_file:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return text
+
+def fetch_pages(urls, cache_dir=CACHE_DIR, max_workers=8, refresh=False):
+    """Fetch many pages concurrently. Returns {url: text}, with None for pages that failed"""
+    def fetch(url):
+        try:
+            return url, fetch_page(url, cache_dir, refresh)
+        except Exception as e:
+            print(f"Error fetching {url}: {str(e)}")
+            return url, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(executor.map(fetch, urls))
+
+def fetch_sitemap(url, cache_dir=SITEMAP_CACHE_DIR, refresh=False):
+    """
+    Return a local path to the sitemap at url, downloading it once into cache_dir.
+    Local paths and file:// URLs are used as they are, so a fixture can stand in for the site.
+    """
+    if url.startswith('file://'):
+        return unquote(urlparse(url).path)
+    if os.path.exists(url):
+        return url
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = os.path.join(cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.xml')
+    if refresh or not os.path.exists(cache_file):
+        with requests.get(url, headers=HEADERS, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            with open(cache_file + '.part', 'wb') as f:
+                for block in response.iter_content(chunk_size=65536):
+                    f.write(block)
+        os.replace(cache_file + '.part', cache_file)
+    return cache_file
+
+def iter_sitemap(url, cache_dir=SITEMAP_CACHE_DIR, refresh=False, parent=None):
+    """
+    Stream (loc, lastmod, sitemap_url) entries from a sitemap or sitemap index.
+    Elements are cleared as soon as they are read, so memory stays flat on large sitemaps.
+    """
+    path = fetch_sitemap(url, cache_dir, refresh)
+    loc = lastmod = None
+    child_sitemaps = []
+    for event, elem in ET.iterparse(path, events=('end',)):
+        tag = elem.tag.rsplit('}', 1)[-1]
+        if tag == 'loc':
+            loc = (elem.text or '').strip()
+        elif tag == 'lastmod':
+            lastmod = (elem.text or '').strip() or None
+        elif tag == 'url':
+            if loc:
+                yield loc, lastmod, parent or url
+            loc = lastmod = None
+            elem.clear()
+        elif tag == 'sitemap':
+            if loc:
+                child_sitemaps.append(loc)
+            loc = lastmod = None
+            elem.clear()
+    for child in child_sitemaps:
+        yield from iter_sitemap(child, cache_dir, refresh, child)
+
+def load_sitemap_state(path=SITEMAP_STATE_FILE):
+    """
+    What the previous sitemap runs learned about each recipe URL:
+    {url: {'lastmod': ..., 'categories': [...], 'recipe': {...}}}
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    # Older state files only kept the lastmod; those pages are fetched again once
+    return {url: entry for url, entry in state.items() if isinstance(entry, dict)}
+
+def save_sitemap_state(state, path=SITEMAP_STATE_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+
+def link_categories(loc, source, known_categories):
+    """Category slugs visible in a recipe URL or the name of the sub-sitemap that listed it"""
+    return [c for c in known_categories if c in loc or c in source]
+
+def discover_recipe_links(base_url=BASE_URL, categories=None, since=None, state=None, refresh=False, cache_dir=SITEMAP_CACHE_DIR):
+    """
+    Find recipe links from the site's sitemap instead of crawling listing pages.
+
+    Only /tarif/ URLs are kept. Recipe URLs carry no category, so each link's
+    'categories' come from the state (learned from the page's breadcrumb when it was
+    last fetched), or from the URL and sub-sitemap name; they are None when unknown.
+    categories keeps links with a matching or unknown category. Each link gets
+    'changed' = True when it is new or its lastmod differs from state, and since
+    (an ISO date) leaves older pages unchanged, so they are not queued for fetching.
+    """
+    sitemap_url = base_url if base_url.endswith('.xml') else f"{base_url.rstrip('/')}/sitemap.xml"
+    state = state if state is not None else {}
+    known_categories = BREAKFAST_CATEGORIES + MAIN_COURSE_CATEGORIES + tuple(categories or ())
+    links = []
+    seen_names = set()
+    for loc, lastmod, source in iter_sitemap(sitemap_url, cache_dir, refresh):
+        if '/tarif/' not in loc:
+            continue
+        entry = state.get(loc)
+        link_cats = entry['categories'] if entry else (link_categories(loc, source, known_categories) or None)
+        if categories and link_cats is not None and not any(c in link_cats for c in categories):
+            continue
+        recipe_name = get_recipe_name_from_url(loc)
+        if recipe_name in seen_names:
+            continue
+        seen_names.add(recipe_name)
+        changed = entry is None or entry.get('lastmod') != lastmod
+        if changed and since and lastmod and lastmod[:10] < since:
+            changed = False
+        links.append({
+            'url': loc,
+            'name': recipe_name,
+            'lastmod': lastmod,
+            'categories': link_cats,
+            'changed': changed
+        })
+    return links
+
+def collect_sitemap_recipes(links, state, duplicate_slugs=(), breakfast_count=30, main_course_count=60):
+    """
+    Fill the breakfast and main course lists from sitemap links.
+    Unchanged recipes are taken from the state without a request; only new or changed
+    pages are fetched, and their breadcrumb categories decide which list they join.
+    Returns (breakfast_recipes, main_course_recipes, fetched page count).
+    """
+    breakfast_recipes, main_course_recipes = [], []
+    fetched = 0
+    for link in filter_known_duplicates(links, duplicate_slugs):
+        if len(breakfast_recipes) >= breakfast_count and len(main_course_recipes) >= main_course_count:
+            break
+        entry = state.get(link['url'])
+        if not link['changed'] and entry and entry.get('recipe'):
+            recipe = entry['recipe']
+        elif link['changed']:
+            print(f"Fetching new or changed recipe: {link['name']}")
+            recipe = get_recipe_details(link)
+            fetched += 1
+            time.sleep(1)
+            if not recipe:
+                continue
+            state[link['url']] = {
+                'lastmod': link['lastmod'],
+                'categories': recipe['categories'] or link['categories'] or [],
+                'recipe': recipe
+            }
+        else:
+            # Left out by --since and never fetched before
+            continue
+        categories = state[link['url']]['categories']
+        if any(c in categories for c in BREAKFAST_CATEGORIES) and len(breakfast_recipes) < breakfast_count:
+            breakfast_recipes.append(recipe)
+        elif any(c in categories for c in MAIN_COURSE_CATEGORIES) and len(main_course_recipes) < main_course_count:
+            main_course_recipes.append(recipe)
+    return breakfast_recipes, main_course_recipes, fetched
 
 def get_recipe_name_from_url(url):
     """Extract recipe name from URL"""
@@ -15,33 +208,83 @@ def get_recipe_name_from_url(url):
     recipe_name = unquote(recipe_name).replace('-', ' ').title()
     return recipe_name
 
+# Unit spellings found in recipes, mapped to the unit names used by convert_to_kg_or_lt
+UNIT_ALIASES = load_registry().unit_aliases
+NUMBER_WORDS = {
+    'yarım': 0.5, 'çeyrek': 0.25, 'bir': 1, 'iki': 2, 'üç': 3, 'dört': 4, 'beş': 5,
+    'altı': 6, 'yedi': 7, 'sekiz': 8, 'dokuz': 9, 'on': 10,
+}
+UNICODE_FRACTIONS = {'½': ' 1/2', '¼': ' 1/4', '¾': ' 3/4', '⅓': ' 1/3', '⅔': ' 2/3'}
+
+_LETTER = 'a-zçğıöşüâîû'
+_QUANTITY = (
+    r"\d+\s+\d+\s*/\s*\d+"      # 1 1/2
+    r"|\d+\s*/\s*\d+"           # 1/2
+    r"|\d+(?:[.,]\d+)?"         # 2, 1,5
+    rf"|(?<![{_LETTER}])(?:{'|'.join(NUMBER_WORDS)})(?![{_LETTER}])(?!\s+yağlı)"
+)
+QUANTITY_PATTERN = re.compile(
+    rf"(?P<low>{_QUANTITY})(?P<half>\s+buçuk)?(?:\s*[-–]\s*(?P<high>{_QUANTITY}))?"
+)
+# Longest spelling first; multi-word units may be glued to the next word ("yemek kaşığıdomates")
+UNIT_PATTERN = re.compile(
+    rf"(?<![{_LETTER}])(?:"
+    + "|".join(
+        re.escape(u) if ' ' in u else rf"{re.escape(u)}(?![{_LETTER}])"
+        for u in sorted(UNIT_ALIASES, key=len, reverse=True)
+    )
+    + ")"
+)
+
+def _quantity_value(text):
+    # "1 / 2" and "1 1 / 2" are the same fractions as "1/2" and "1 1/2"
+    text = re.sub(r"\s*/\s*", "/", text.strip())
+    if text in NUMBER_WORDS:
+        return float(NUMBER_WORDS[text])
+    parts = text.split()
+    if len(parts) > 1:
+        return float(parts[0]) + _quantity_value(" ".join(parts[1:]))
+    if '/' in text:
+        numerator, denominator = text.split('/')
+        return float(numerator) / float(denominator) if float(denominator) else float(numerator)
+    return float(text.replace(',', '.'))
+
 def parse_amount(ingredient_text):
-    """Parse amount and unit from ingredient text"""
-    units = {
-        'kg': 1000, 'g': 1, 'gr': 1, 'gram': 1,
-        'lt': 1000, 'ml': 1, 'cc': 1,
-        'adet': 1, 'tane': 1, 
-        'çay kaşığı': 5,
-        'yemek kaşığı': 15,
-        'su bardağı': 200,
-        'fincan': 100,
-        'tatlı kaşığı': 10
-    }
-    
+    """
+    Parse amount and unit from ingredient text.
+    Handles fractions (1/2, ½, 1 1/2, yarım), ranges (2-3 gives the midpoint) and
+    returns the unit names used by convert_to_kg_or_lt; '' when there is no unit.
+    """
+    text = ingredient_text.replace('İ', 'i').replace('I', 'ı').lower()
+    for symbol, fraction in UNICODE_FRACTIONS.items():
+        text = text.replace(symbol, fraction)
+
     amount = 1
-    unit = ''  # Empty string as default unit
-    
-    numbers = re.findall(r'\d+(?:[.,]\d+)?', ingredient_text)
-    if numbers:
-        amount = float(numbers[0].replace(',', '.'))
-    
-    for unit_name, multiplier in units.items():
-        if unit_name in ingredient_text.lower():
-            unit = unit_name
-            break
-    
+    search_from = 0
+    match = QUANTITY_PATTERN.search(text)
+    if match:
+        amount = _quantity_value(match.group('low'))
+        if match.group('half'):
+            amount += 0.5
+        if match.group('high'):
+            amount = (amount + _quantity_value(match.group('high'))) / 2
+        search_from = match.end()
+
+    # Prefer the unit that follows the quantity ("1 paket (10 gr)" is a paket)
+    unit_match = UNIT_PATTERN.search(text, search_from) or UNIT_PATTERN.search(text)
+    unit = UNIT_ALIASES[unit_match.group()] if unit_match else ''
     return amount, unit
 
+def parse_amounts(ingredient_texts):
+    """Parse a batch of ingredient lines, parsing each distinct line only once"""
+    parsed = {}
+    results = []
+    for text in ingredient_texts:
+        if text not in parsed:
+            parsed[text] = parse_amount(text)
+        results.append(parsed[text])
+    return results
+
 def get_recipe_links(category_url):
     """Scrape recipe links from ye-mek.net"""
     links = []
@@ -58,10 +301,7 @@ def get_recipe_links(category_url):
             
             print(f"\nScraping page {current_page}...")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(page_url, headers=headers)
+            response = requests.get(page_url, headers=HEADERS)
             response.encoding = 'utf-8'  # Ensure proper Turkish character encoding
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -109,46 +349,54 @@ def get_recipe_links(category_url):
     
     return links
 
+def parse_recipe_page(html, url, recipe_name):
+    """Read title, ingredients and instructions from a recipe page's HTML"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    title = soup.select_one("h1.entry-title")
+    title = title.text.strip() if title else recipe_name
+    
+    ingredients = []
+    ingredient_texts = [li.get_text(strip=True) for li in soup.select('li[itemprop="recipeIngredient"]')]
+    for ingredient_text, (amount, unit) in zip(ingredient_texts, parse_amounts(ingredient_texts)):
+        ingredients.append({
+            'text': ingredient_text,
+            'amount': amount,
+            'unit': unit
+        })
+    
+    instructions = []
+    instruction_list = soup.select("div.instructions ol li")
+    for instruction in instruction_list:
+        instruction_text = instruction.text.strip()
+        instructions.append(instruction_text)
+    
+    # Category slugs from the breadcrumb trail ("Ana Sayfa > Kahvaltılıklar > ...")
+    categories = []
+    for link in soup.select('[class*="breadcrumb"] a[href], [itemtype*="BreadcrumbList"] a[href]'):
+        path = urlparse(link['href']).path.strip('/')
+        if path and '/tarif/' not in f"/{path}/" and path.split('/')[-1] not in categories:
+            categories.append(path.split('/')[-1])
+    
+    return {
+        'title': title,
+        'name': recipe_name,
+        'ingredients': ingredients,
+        'instructions': instructions,
+        'url': url,
+        'categories': categories
+    }
+
 def get_recipe_details(recipe_info):
     """Scrape recipe details including ingredients"""
     url = recipe_info['url']
     recipe_name = recipe_info['name']
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
-        response.encoding = 'utf-8'  # Ensure proper Turkish character encoding
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        title = soup.select_one("h1.entry-title")
-        title = title.text.strip() if title else recipe_name
-        
-        ingredients = []
-        ingredient_list = soup.select('li[itemprop="recipeIngredient"]')
-        for ingredient in ingredient_list:
-            ingredient_text = ingredient.get_text(strip=True)
-            amount, unit = parse_amount(ingredient_text)
-            ingredients.append({
-                'text': ingredient_text,
-                'amount': amount,
-                'unit': unit
-            })
-        
-        instructions = []
-        instruction_list = soup.select("div.instructions ol li")
-        for instruction in instruction_list:
-            instruction_text = instruction.text.strip()
-            instructions.append(instruction_text)
-        
-        return {
-            'title': title,
-            'name': recipe_name,
-            'ingredients': ingredients,
-            'instructions': instructions,
-            'url': url
-        }
+        # Only the sitemap can tell that a cached page is still current; crawled links
+        # carry no 'changed' flag and are always fetched again
+        html = fetch_page(url, refresh=recipe_info.get('changed', True))
+        return parse_recipe_page(html, url, recipe_name)
     except Exception as e:
         print(f"Error getting recipe details from {url}: {str(e)}")
         return None
@@ -200,72 +448,103 @@ def save_recipes(recipes, filename="recipes.json"):
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(recipes, f, ensure_ascii=False, indent=2)
 
-def main():
-    try:
-        # Get breakfast recipes
-        print("Scraping breakfast recipes...")
-        breakfast_links = get_recipe_links("https://ye-mek.net/kahvaltiliklar")
-        print(f"Found {len(breakfast_links)} breakfast recipes")
-        
-        if len(breakfast_links) < 30:
-            print("Warning: Not enough breakfast recipes found. Trying alternative URL...")
-            # Try alternative URL for breakfast recipes
-            breakfast_links = get_recipe_links("https://ye-mek.net/kahvalti-tarifleri")
-            print(f"Found {len(breakfast_links)} breakfast recipes from alternative URL")
-        
-        breakfast_recipes = []
-        # Only collect 30 breakfast recipes
-        i = 0
-        while len(breakfast_recipes) < 30 and i < len(breakfast_links):
-            recipe_info = breakfast_links[i]
-            print(f"\nScraping breakfast recipe {len(breakfast_recipes) + 1}/30: {recipe_info['name']}")
-            recipe = get_recipe_details(recipe_info)
-            if recipe:
-                breakfast_recipes.append(recipe)
-                print(f"Successfully scraped: {recipe['title']}")
-            else:
-                print(f"Failed to scrape recipe: {recipe_info['name']}")
-            i += 1
-            time.sleep(1)
+def collect_crawled_recipes(duplicate_slugs=()):
+    """Crawl the category listing pages and scrape 30 breakfast and 60 main course recipes"""
+    # Get breakfast recipes
+    print("Scraping breakfast recipes...")
+    breakfast_links = get_recipe_links("https://ye-mek.net/kahvaltiliklar")
+    print(f"Found {len(breakfast_links)} breakfast recipes")
+    
+    if len(breakfast_links) < 30:
+        print("Warning: Not enough breakfast recipes found. Trying alternative URL...")
+        # Try alternative URL for breakfast recipes
+        breakfast_links = get_recipe_links("https://ye-mek.net/kahvalti-tarifleri")
+        print(f"Found {len(breakfast_links)} breakfast recipes from alternative URL")
+    breakfast_links = filter_known_duplicates(breakfast_links, duplicate_slugs)
+    
+    breakfast_recipes = []
+    # Only collect 30 breakfast recipes
+    i = 0
+    while len(breakfast_recipes) < 30 and i < len(breakfast_links):
+        recipe_info = breakfast_links[i]
+        print(f"\nScraping breakfast recipe {len(breakfast_recipes) + 1}/30: {recipe_info['name']}")
+        recipe = get_recipe_details(recipe_info)
+        if recipe:
+            breakfast_recipes.append(recipe)
+            print(f"Successfully scraped: {recipe['title']}")
+        else:
+            print(f"Failed to scrape recipe: {recipe_info['name']}")
+        i += 1
+        time.sleep(1)
+    
+    # Get main course recipes
+    print("\nScraping main course recipes...")
+    main_course_links = get_recipe_links("https://ye-mek.net/ana-yemek-tarifleri")
+    print(f"Found {len(main_course_links)} main course recipes")
+    
+    # Try alternative URLs for main course recipes if needed
+    if len(main_course_links) < 60:
+        print("Warning: Not enough main course recipes found. Trying alternative URLs...")
         
-        # Get main course recipes
-        print("\nScraping main course recipes...")
-        main_course_links = get_recipe_links("https://ye-mek.net/ana-yemek-tarifleri")
-        print(f"Found {len(main_course_links)} main course recipes")
+        # Try meat dishes
+        print("\nTrying meat dishes...")
+        meat_links = get_recipe_links("https://ye-mek.net/et-yemekleri")
+        print(f"Found {len(meat_links)} meat recipes")
+        main_course_links.extend(meat_links)
         
-        # Try alternative URLs for main course recipes if needed
+        # If still not enough, try vegetable dishes
         if len(main_course_links) < 60:
-            print("Warning: Not enough main course recipes found. Trying alternative URLs...")
-            
-            # Try meat dishes
-            print("\nTrying meat dishes...")
-            meat_links = get_recipe_links("https://ye-mek.net/et-yemekleri")
-            print(f"Found {len(meat_links)} meat recipes")
-            main_course_links.extend(meat_links)
-            
-            # If still not enough, try vegetable dishes
-            if len(main_course_links) < 60:
-                print("\nTrying vegetable dishes...")
-                veg_links = get_recipe_links("https://ye-mek.net/sebze-yemekleri")
-                print(f"Found {len(veg_links)} vegetable recipes")
-                main_course_links.extend(veg_links)
-            
-            print(f"Total main course recipes found across all categories: {len(main_course_links)}")
+            print("\nTrying vegetable dishes...")
+            veg_links = get_recipe_links("https://ye-mek.net/sebze-yemekleri")
+            print(f"Found {len(veg_links)} vegetable recipes")
+            main_course_links.extend(veg_links)
         
-        main_course_recipes = []
-        # Only collect 60 main course recipes
-        i = 0
-        while len(main_course_recipes) < 60 and i < len(main_course_links):
-            recipe_info = main_course_links[i]
-            print(f"\nScraping main course recipe {len(main_course_recipes) + 1}/60: {recipe_info['name']}")
-            recipe = get_recipe_details(recipe_info)
-            if recipe:
-                main_course_recipes.append(recipe)
-                print(f"Successfully scraped: {recipe['title']}")
-            else:
-                print(f"Failed to scrape recipe: {recipe_info['name']}")
-            i += 1
-            time.sleep(1)
+        print(f"Total main course recipes found across all categories: {len(main_course_links)}")
+    main_course_links = filter_known_duplicates(main_course_links, duplicate_slugs)
+    
+    main_course_recipes = []
+    # Only collect 60 main course recipes
+    i = 0
+    while len(main_course_recipes) < 60 and i < len(main_course_links):
+        recipe_info = main_course_links[i]
+        print(f"\nScraping main course recipe {len(main_course_recipes) + 1}/60: {recipe_info['name']}")
+        recipe = get_recipe_details(recipe_info)
+        if recipe:
+            main_course_recipes.append(recipe)
+            print(f"Successfully scraped: {recipe['title']}")
+        else:
+            print(f"Failed to scrape recipe: {recipe_info['name']}")
+        i += 1
+        time.sleep(1)
+    return breakfast_recipes, main_course_recipes
+
+def main():
+    # Usage: python recipes_vbg_2.py [--sitemap [base_url_or_sitemap_file]] [--since YYYY-MM-DD]
+    args = sys.argv[1:]
+    use_sitemap = '--sitemap' in args
+    base_url = BASE_URL
+    if use_sitemap:
+        position = args.index('--sitemap') + 1
+        if position < len(args) and not args[position].startswith('--'):
+            base_url = args[position]
+    since = args[args.index('--since') + 1] if '--since' in args else None
+    sitemap_state = load_sitemap_state() if use_sitemap else {}
+
+    try:
+        # Recipes clustered as near-duplicates by recipe_dedup.py are not fetched again
+        duplicate_slugs = load_duplicate_slugs()
+        if duplicate_slugs:
+            print(f"Skipping {len(duplicate_slugs)} known duplicate recipes")
+
+        if use_sitemap:
+            links = discover_recipe_links(base_url, since=since, state=sitemap_state)
+            print(f"Found {len(links)} recipes in the sitemap ({sum(link['changed'] for link in links)} new or changed)")
+            breakfast_recipes, main_course_recipes, fetched = collect_sitemap_recipes(links, sitemap_state, duplicate_slugs)
+            print(f"Fetched {fetched} new or changed recipe pages, reused the rest from {SITEMAP_STATE_FILE}")
+        # Listing pages are only crawled without a usable sitemap; an incremental
+        # (--since) run never falls back to a full crawl
+        if not use_sitemap or (not links and not since):
+            breakfast_recipes, main_course_recipes = collect_crawled_recipes(duplicate_slugs)
         
         print(f"\nTotal breakfast recipes collected: {len(breakfast_recipes)}")
         print(f"Total main course recipes collected: {len(main_course_recipes)}")
@@ -289,6 +568,8 @@ def main():
             'meal_plan': meal_plan
         }
         save_recipes(data, "meal_plan.json")
+        if use_sitemap:
+            save_sitemap_state(sitemap_state)
         
         print("\nSaved recipes and meal plan to meal_plan.json")
         
@@ -305,5 +586,5 @@ def main():
         print(f"An error occurred: {str(e)}")
 
 if __name__ == "__main__":
-    main()
+    run_main(main, "recipes_vbg_2")
 
@@ -0,0 +1,288 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+import tempfile
+import time
+from main_model_old import UNITS, load_price_data, build_matcher, build_cost_basis, iter_recipe_ingredients, recipe_key
+from compact_results import save_compact, compact_frame
+from calculate_daily_costs import stream_meal_costs, MEAL_KEYS
+from recipe_cost_vectors import RecipeCostModel
+from corpus_costs import cost_corpus
+from generate_daily_plan import build_daily_plan, build_daily_plan_vectorized
+from stage_profiler import stage, run_main
+import baseline_costing as baseline
+
+REPORT_FILE = os.path.join("output", "regression_report.xlsx")
+RTOL = 1e-9
+ATOL = 1e-9
+PRICE_UNITS = ['kg', 'lt', 'adet', 'paket']
+MEAL_TYPES = ['breakfast', 'lunch', 'dinner']
+# The published sample: the monthly total in the README and the number of lines the
+# baseline prices. These are the figures to protect, not whatever the code gives today.
+SAMPLE_PLAN_FILE = os.path.join("input_created", "meal_plan.json")
+SAMPLE_PRICES_FILE = os.path.join("input_created", "unique_ingredients2.xlsx")
+EXPECTED_MONTHLY_TOTAL = 10453.54
+EXPECTED_COSTED_LINES = 892
+TOTAL_TOLERANCE = 0.005
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def compare_numbers(legacy, fast, rtol=RTOL, atol=ATOL):
+    """(mismatches, max abs difference); None and NaN only match each other"""
+    legacy = pd.to_numeric(pd.Series(legacy, dtype=object), errors='coerce').to_numpy(dtype=float)
+    fast = pd.to_numeric(pd.Series(fast, dtype=object), errors='coerce').to_numpy(dtype=float)
+    if len(legacy) != len(fast):
+        return max(len(legacy), len(fast)), np.inf
+    both_nan = np.isnan(legacy) & np.isnan(fast)
+    close = np.isclose(legacy, fast, rtol=rtol, atol=atol) | both_nan
+    diff = np.abs(legacy - fast)
+    diff = diff[~np.isnan(diff)]
+    return int((~close).sum()), float(diff.max()) if len(diff) else 0.0
+
+def compare_labels(legacy, fast):
+    """Mismatching entries of two label columns; None, NaN and '' count as the same blank"""
+    legacy = pd.Series(legacy, dtype=object).where(pd.notna(legacy), '').astype(str).to_numpy()
+    fast = pd.Series(fast, dtype=object).where(pd.notna(fast), '').astype(str).to_numpy()
+    if len(legacy) != len(fast):
+        return max(len(legacy), len(fast))
+    return int((legacy != fast).sum())
+
+# --- Generated inputs ---
+
+def corpus_lines(meal_plan_json):
+    """Every (text, amount, unit) line of the scraped recipes, the pool generated inputs draw from"""
+    lines = []
+    for key in ('breakfast_recipes', 'main_course_recipes'):
+        for recipe in meal_plan_json.get(key, []):
+            lines.extend(iter_recipe_ingredients(recipe))
+    return lines
+
+def generate_lines(rng, pool, count, price_units=PRICE_UNITS, unit_swap=0.3):
+    """
+    count ingredient lines resampled from the pool. Amounts are rescaled and a share of
+    the units is swapped for any registry unit, alias or a blank, so every conversion
+    branch sees traffic.
+    """
+    units = list(UNITS.unit_aliases) + ['', 'dilim']
+    picks = rng.integers(0, len(pool), count)
+    texts = np.array([pool[i][0] for i in picks], dtype=object)
+    amounts = np.array([float(pool[i][1]) for i in picks]) * rng.choice([0.25, 0.5, 1, 1, 2, 3], count)
+    line_units = np.array([pool[i][2] for i in picks], dtype=object)
+    swap = rng.random(count) < unit_swap
+    line_units[swap] = rng.choice(np.array(units, dtype=object), swap.sum())
+    return pd.DataFrame({
+        'text': texts,
+        'amount': amounts,
+        'unit': line_units,
+        'price_unit': rng.choice(np.array(price_units, dtype=object), count),
+    })
+
+def generate_plan(rng, pool, days, recipe_count=300, lines_per_recipe=(4, 16)):
+    """A meal plan of `days` days drawn from recipe_count generated recipes"""
+    recipes = []
+    for i in range(recipe_count):
+        lines = generate_lines(rng, pool, int(rng.integers(*lines_per_recipe)))
+        recipes.append({
+            'name': f"Generated Recipe {i:05d}",
+            'ingredients': [{'text': row.text, 'amount': row.amount, 'unit': row.unit} for row in lines.itertuples()],
+        })
+    picks = rng.integers(0, recipe_count, (days, len(MEAL_TYPES)))
+    return [
+        {'day': day + 1, **{meal_type: recipes[picks[day, i]] for i, meal_type in enumerate(MEAL_TYPES)}}
+        for day in range(days)
+    ]
+
+# --- Legacy implementations ---
+# Line conversion and costing come from the frozen copies in baseline_costing.py, so the
+# legacy side shares no code with the fast side it checks.
+
+def legacy_meal_costs(results_df):
+    """The in-memory aggregation of calculate_meal_costs"""
+    meal_costs = results_df.groupby(MEAL_KEYS, observed=True)['cost'].sum().reset_index()
+    meal_costs[['category', 'recipe_name']] = meal_costs[['category', 'recipe_name']].astype(object)
+    return meal_costs
+
+# --- Fast implementations ---
+
+def basis_ingredient_costs(meal_plan, price_df, vectorizer, price_vecs):
+    """Costs of every plan line from build_cost_basis; NaN where the line cannot be costed"""
+    basis = build_cost_basis(meal_plan, price_df, vectorizer, price_vecs)
+    price_idx = basis['price_idx'].to_numpy()
+    amounts = price_df['amount'].to_numpy(dtype=float)
+    unit_prices = price_df['price'].to_numpy(dtype=float) / np.where(amounts == 0, np.nan, amounts)
+    costs = np.where(price_idx >= 0, basis['converted_amount'].to_numpy() * unit_prices[np.maximum(price_idx, 0)], np.nan)
+    return basis, costs
+
+def model_meal_costs(basis, price_df):
+    return RecipeCostModel.from_basis(basis, price_df).meal_costs()
+
+def streamed_meal_costs(results_df, chunk_rows):
+    """stream_meal_costs over a compact copy of the table, with chunks small enough to split meals"""
+    with tempfile.TemporaryDirectory() as compact_dir:
+        save_compact(compact_frame(results_df), compact_dir)
+        start = time.perf_counter()
+        meal_costs = stream_meal_costs(chunk_rows, results_file=os.path.join(compact_dir, "missing.xlsx"), compact_dir=compact_dir)
+        return meal_costs, time.perf_counter() - start
+
+def merged_meal_costs(legacy, fast):
+    """Align two meal cost tables on (day, category, recipe_name); unmatched meals keep NaN"""
+    keys = lambda df: df.assign(day=df['day'].astype(int), category=df['category'].astype(str), recipe_name=df['recipe_name'].astype(str))
+    return keys(legacy)[MEAL_KEYS + ['cost']].merge(keys(fast)[MEAL_KEYS + ['cost']], on=MEAL_KEYS, how='outer', suffixes=('_legacy', '_fast'))
+
+# --- Pairs ---
+
+def check_conversion(lines):
+    """convert_to_kg_or_lt line by line against UnitRegistry.convert_many"""
+    def legacy():
+        converted = [baseline.convert_to_kg_or_lt(row.amount, row.unit, row.text, row.price_unit) for row in lines.itertuples()]
+        return [amount for amount, _ in converted], [unit for _, unit in converted]
+
+    (legacy_amounts, legacy_units), legacy_seconds = timed(legacy)
+    (fast_amounts, fast_units), fast_seconds = timed(
+        UNITS.convert_many, lines['amount'].to_numpy(), list(lines['unit']), list(lines['text']), lines['price_unit'].to_numpy())
+    # The scalar path leaves the recipe unit in place when it gives up; the vector path leaves a blank
+    legacy_units = [unit if amount is not None else '' for amount, unit in zip(legacy_amounts, legacy_units)]
+    mismatches, max_diff = compare_numbers(legacy_amounts, fast_amounts)
+    mismatches += compare_labels(legacy_units, fast_units)
+    return 'baseline convert_to_kg_or_lt vs convert_many', len(lines), legacy_seconds, fast_seconds, mismatches, max_diff
+
+def check_ingredient_costs(meal_plan, price_df, vectorizer, price_vecs):
+    """The baseline main() costing loop against build_cost_basis"""
+    legacy_df, legacy_seconds = timed(baseline.cost_meal_plan, meal_plan, price_df)
+    (basis, fast_costs), fast_seconds = timed(basis_ingredient_costs, meal_plan, price_df, vectorizer, price_vecs)
+    mismatches, max_diff = compare_numbers(legacy_df['cost'], fast_costs)
+    row = ('baseline calculate_cost vs build_cost_basis', len(legacy_df), legacy_seconds, fast_seconds, mismatches, max_diff)
+    return row, legacy_df, basis
+
+def check_meal_costs(legacy_df, basis, price_df):
+    """calculate_meal_costs' groupby against the RecipeCostModel built from the cost basis"""
+    legacy, legacy_seconds = timed(legacy_meal_costs, legacy_df)
+    fast, fast_seconds = timed(model_meal_costs, basis, price_df)
+    merged = merged_meal_costs(legacy, fast)
+    mismatches, max_diff = compare_numbers(merged['cost_legacy'], merged['cost_fast'])
+    return ('calculate_meal_costs vs RecipeCostModel', len(merged), legacy_seconds, fast_seconds, mismatches, max_diff), legacy
+
+def check_streamed_meal_costs(legacy_df, chunk_rows):
+    """calculate_meal_costs' groupby against the chunked stream_meal_costs"""
+    legacy, legacy_seconds = timed(legacy_meal_costs, legacy_df)
+    fast, fast_seconds = streamed_meal_costs(legacy_df, chunk_rows)
+    merged = merged_meal_costs(legacy, fast)
+    mismatches, max_diff = compare_numbers(merged['cost_legacy'], merged['cost_fast'])
+    return 'calculate_meal_costs vs stream_meal_costs', len(merged), legacy_seconds, fast_seconds, mismatches, max_diff
+
+def check_corpus_costs(meal_plan, legacy_df, price_df, vectorizer, price_vecs):
+    """Per-recipe sums of the legacy line costs against cost_corpus over the plan's recipes"""
+    recipes = {}
+    for day_obj in meal_plan:
+        for meal_type in MEAL_TYPES:
+            recipes.setdefault(recipe_key(day_obj[meal_type]), (meal_type, day_obj[meal_type]))
+
+    def legacy():
+        costs = legacy_df.assign(recipe_name=legacy_df['recipe_name'].astype(str))
+        first_meal = costs.drop_duplicates('recipe_name')[MEAL_KEYS]
+        costs = costs.merge(first_meal, on=MEAL_KEYS)
+        return costs.groupby('recipe_name')['cost'].sum()
+
+    legacy_costs, legacy_seconds = timed(legacy)
+    (corpus_df, _, _), fast_seconds = timed(cost_corpus, list(recipes.values()), price_df, vectorizer, price_vecs)
+    fast_costs = corpus_df.set_index('recipe_name')['cost']
+    mismatches, max_diff = compare_numbers(legacy_costs.reindex(fast_costs.index), fast_costs)
+    return 'recipe sums vs cost_corpus', len(fast_costs), legacy_seconds, fast_seconds, mismatches, max_diff
+
+def check_daily_plan(meal_costs, num_days):
+    """generate_daily_plan's iloc loop against the vectorized rotation"""
+    legacy, legacy_seconds = timed(build_daily_plan, meal_costs.copy(), num_days)
+    fast, fast_seconds = timed(build_daily_plan_vectorized, meal_costs.copy(), num_days)
+    mismatches = 0 if list(legacy.columns) == list(fast.columns) else len(legacy)
+    max_diff = 0.0
+    for column in legacy.columns:
+        if column.endswith('_name'):
+            mismatches += compare_labels(legacy[column], fast[column])
+        else:
+            column_mismatches, column_diff = compare_numbers(legacy[column], fast[column])
+            mismatches += column_mismatches
+            max_diff = max(max_diff, column_diff)
+    return 'build_daily_plan vs vectorized', len(legacy), legacy_seconds, fast_seconds, mismatches, max_diff
+
+def check_sample_plan(plan_file=SAMPLE_PLAN_FILE, prices_file=SAMPLE_PRICES_FILE):
+    """
+    Cost the stored sample plan with the baseline loop and with the current code, and
+    compare each monthly total and costed-line count with the published figures
+    """
+    with open(plan_file, 'r', encoding='utf-8') as f:
+        meal_plan = json.load(f)['meal_plan']
+    legacy_df, legacy_seconds = timed(baseline.cost_meal_plan, meal_plan, baseline.load_price_data(prices_file))
+    price_df = load_price_data(prices_file)
+    vectorizer, price_vecs = build_matcher(price_df)
+    (_, fast_costs), fast_seconds = timed(basis_ingredient_costs, meal_plan, price_df, vectorizer, price_vecs)
+    totals = [legacy_df['cost'].sum(), np.nansum(fast_costs)]
+    diffs = [abs(total - EXPECTED_MONTHLY_TOTAL) for total in totals]
+    mismatches = int(sum(diff > TOTAL_TOLERANCE for diff in diffs))
+    costed = [int(legacy_df['cost'].notna().sum()), int((~np.isnan(fast_costs)).sum())]
+    mismatches += sum(count != EXPECTED_COSTED_LINES for count in costed)
+    print(f"Sample plan: legacy {totals[0]:.2f} TL over {costed[0]} lines, fast {totals[1]:.2f} TL over "
+          f"{costed[1]} of {len(fast_costs)} lines "
+          f"(expected {EXPECTED_MONTHLY_TOTAL:.2f} TL, {EXPECTED_COSTED_LINES} lines)")
+    return 'sample plan vs published monthly total', len(legacy_df), legacy_seconds, fast_seconds, mismatches, max(diffs)
+
+def run_harness(meal_plan_json, price_df, lines=200000, days=365, plan_days=3650, seed=42, chunk_rows=997):
+    """Run every legacy/fast pair on inputs generated from `seed` and return the report table"""
+    rng = np.random.default_rng(seed)
+    pool = corpus_lines(meal_plan_json)
+    vectorizer, price_vecs = build_matcher(price_df)
+    rows = []
+    with stage("conversion"):
+        rows.append(check_conversion(generate_lines(rng, pool, lines)))
+    meal_plan = generate_plan(rng, pool, days)
+    with stage("ingredient costs"):
+        row, legacy_df, basis = check_ingredient_costs(meal_plan, price_df, vectorizer, price_vecs)
+        rows.append(row)
+    with stage("meal costs"):
+        row, meal_costs = check_meal_costs(legacy_df, basis, price_df)
+        rows.append(row)
+        rows.append(check_streamed_meal_costs(legacy_df, chunk_rows))
+    with stage("corpus costs"):
+        rows.append(check_corpus_costs(meal_plan, legacy_df, price_df, vectorizer, price_vecs))
+    with stage("daily plan"):
+        rows.append(check_daily_plan(meal_costs, plan_days))
+    with stage("sample plan"):
+        rows.append(check_sample_plan())
+
+    report = pd.DataFrame(rows, columns=['pair', 'rows', 'legacy_seconds', 'fast_seconds', 'mismatches', 'max_abs_diff'])
+    report['speedup'] = report['legacy_seconds'] / report['fast_seconds'].where(report['fast_seconds'] > 0)
+    report['status'] = np.where(report['mismatches'] == 0, 'PASS', 'FAIL')
+    report['seed'] = seed
+    return report
+
+def main():
+    # Usage: python regression_harness.py [meal_plan_file] [ingredients_file] [lines] [days] [seed]
+    meal_plan_file = sys.argv[1] if len(sys.argv) > 1 else 'meal_plan.json'
+    ingredients_file = sys.argv[2] if len(sys.argv) > 2 else 'unique_ingredients2.xlsx'
+    lines = int(sys.argv[3]) if len(sys.argv) > 3 else 200000
+    days = int(sys.argv[4]) if len(sys.argv) > 4 else 365
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else 42
+
+    with open(meal_plan_file, 'r', encoding='utf-8') as f:
+        meal_plan_json = json.load(f)
+    price_df = load_price_data(ingredients_file)
+    print(f"Comparing legacy and fast paths on {lines} generated lines and a {days}-day plan (seed {seed})...")
+    report = run_harness(meal_plan_json, price_df, lines=lines, days=days, seed=seed)
+
+    os.makedirs("output", exist_ok=True)
+    report.to_excel(REPORT_FILE, index=False)
+
+    print("\n=== REGRESSION REPORT ===")
+    for row in report.itertuples():
+        print(f"{row.status}  {row.pair:<42} {row.rows:>8} rows  legacy {row.legacy_seconds:8.3f} s  "
+              f"fast {row.fast_seconds:8.3f} s  x{row.speedup:7.1f}  mismatches {row.mismatches}  max diff {row.max_abs_diff:.2e}")
+    print(f"\nReport saved to: {REPORT_FILE}")
+    if (report['status'] == 'FAIL').any():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    run_main(main, "regression_harness")
@@ -0,0 +1,87 @@
+import pandas as pd
+import os
+import sys
+from report_writer import ReportWriter
+from compact_results import iter_costed_chunks, RESULT_COLUMNS
+from calculate_daily_costs import build_daily_costs, MEAL_KEYS
+from generate_daily_plan import build_daily_plan_vectorized
+from price_history import NET_MINIMUM_WAGE
+from stage_profiler import stage, run_main
+
+REPORT_FILE = os.path.join("output", "meal_plan_report.xlsx")
+
+def write_ingredient_costs(writer, chunks, name="Ingredient Costs"):
+    """
+    Stream the costed ingredient table chunk by chunk and return the per-meal cost sums,
+    so the recipe totals come out of the same pass over the data.
+    """
+    partial_sums = []
+
+    def summed(chunks):
+        for chunk in chunks:
+            chunk = chunk.reindex(columns=RESULT_COLUMNS)
+            costs = pd.to_numeric(chunk['cost'], errors='coerce')
+            partial_sums.append(costs.groupby([chunk[key] for key in MEAL_KEYS], observed=True).sum())
+            yield chunk
+
+    writer.write_chunks(name, RESULT_COLUMNS, summed(chunks))
+    if not partial_sums:
+        return pd.DataFrame(columns=MEAL_KEYS + ['cost'])
+    meal_costs = pd.concat(partial_sums).groupby(level=[0, 1, 2], observed=True).sum().reset_index()
+    meal_costs[['category', 'recipe_name']] = meal_costs[['category', 'recipe_name']].astype(object)
+    return meal_costs
+
+def summary_stats(meal_costs, daily_costs, minimum_wage=NET_MINIMUM_WAGE):
+    """Headline numbers of the report as (statistic, value) rows"""
+    monthly_total = daily_costs['Total Daily Cost'].sum()
+    days = max(len(daily_costs), 1)
+    rows = [
+        ('Total monthly cost (TL)', monthly_total),
+        ('Average daily cost (TL)', monthly_total / days),
+        ('Share of net minimum wage (%)', monthly_total / minimum_wage * 100),
+        ('Days', len(daily_costs)),
+        ('Meals', len(meal_costs)),
+    ]
+    for meal_type in ['breakfast', 'lunch', 'dinner']:
+        total = meal_costs.loc[meal_costs['category'] == meal_type, 'cost'].sum()
+        rows.append((f'Average {meal_type} cost (TL)', total / days))
+    if len(meal_costs):
+        most_expensive = meal_costs.loc[meal_costs['cost'].idxmax()]
+        rows.append(('Most expensive meal', f"{most_expensive['recipe_name']} ({most_expensive['category']}, Day {most_expensive['day']})"))
+        rows.append(('Most expensive meal cost (TL)', most_expensive['cost']))
+    return pd.DataFrame(rows, columns=['statistic', 'value'])
+
+def export_report(path=REPORT_FILE, chunk_rows=100000, num_days=30):
+    """Write ingredient costs, recipe totals, daily costs, daily plan and summary into one workbook"""
+    writer = ReportWriter(path)
+    try:
+        with stage("ingredient costs"):
+            meal_costs = write_ingredient_costs(writer, iter_costed_chunks(chunk_rows=chunk_rows))
+        with stage("recipe totals"):
+            writer.write_frame("Recipe Totals", meal_costs)
+        with stage("daily costs"):
+            daily_costs = build_daily_costs(meal_costs)
+            # Same text as pandas writes for the dict column of daily_costs_per_month.xlsx
+            writer.write_frame("Daily Costs", daily_costs.assign(**{'Meal Costs': daily_costs['Meal Costs'].astype(str)}))
+        with stage("daily plan"):
+            writer.write_frame("Daily Plan", build_daily_plan_vectorized(meal_costs.copy(), num_days))
+        with stage("summary"):
+            summary = summary_stats(meal_costs, daily_costs)
+            writer.write_frame("Summary", summary)
+    finally:
+        writer.close()
+    return path, summary
+
+def main():
+    # Usage: python report_exporter.py [report_file] [chunk_rows]
+    path = sys.argv[1] if len(sys.argv) > 1 else REPORT_FILE
+    chunk_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    print("Writing report from the costed ingredient table...")
+    path, summary = export_report(path, chunk_rows)
+    print(f"Report saved to: {path}")
+    print("\n=== REPORT SUMMARY ===")
+    for statistic, value in summary.itertuples(index=False):
+        print(f"{statistic}: {value:.2f}" if isinstance(value, float) else f"{statistic}: {value}")
+
+if __name__ == "__main__":
+    run_main(main, "report_exporter")
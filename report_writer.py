@@ -0,0 +1,73 @@
+import os
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+EXCEL_MAX_ROWS = 1048576
+
+def _cell_values(chunk):
+    """Columns of a chunk as plain Python lists, with blanks for missing values"""
+    columns = []
+    for column in chunk.columns:
+        series = chunk[column]
+        if series.dtype == np.float32:
+            # Shortest text that reads back as the same float32: 0.70710677, not 0.7071067690849304
+            values = series.to_numpy().astype(str).astype(float)
+            columns.append([None if np.isnan(v) else v for v in values.tolist()])
+        elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=float)
+            columns.append([None if np.isnan(v) else v for v in values.tolist()])
+        else:
+            series = series.astype(object)
+            columns.append(series.where(series.notna(), None).tolist())
+    return zip(*columns)
+
+class ReportWriter:
+    """
+    Single-pass writer for Excel workbooks.
+    xlsxwriter's constant_memory mode flushes each row to disk as soon as the next one
+    starts, so memory stays flat however many ingredient rows a batch run produces.
+    Rows must therefore be written top to bottom, one sheet at a time.
+    """
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        self.header_format = self.workbook.add_format({'bold': True})
+
+    def _add_sheet(self, name, header):
+        sheet = self.workbook.add_worksheet(name)
+        sheet.write_row(0, 0, header, self.header_format)
+        sheet.set_column(0, len(header) - 1, 16)
+        sheet.freeze_panes(1, 0)
+        return sheet
+
+    def write_rows(self, name, header, rows):
+        """Write an iterable of rows, continuing on '<name> 2', '<name> 3'... past Excel's row limit"""
+        part = 1
+        sheet = self._add_sheet(name, header)
+        row_number = 1
+        written = 0
+        for row in rows:
+            if row_number == EXCEL_MAX_ROWS:
+                part += 1
+                sheet = self._add_sheet(f"{name} {part}", header)
+                row_number = 1
+            sheet.write_row(row_number, 0, row)
+            row_number += 1
+            written += 1
+        return written
+
+    def write_chunks(self, name, header, chunks):
+        """Write DataFrame chunks with the columns in header onto one sheet, as they arrive"""
+        rows = (row for chunk in chunks for row in _cell_values(chunk.reindex(columns=header)))
+        return self.write_rows(name, header, rows)
+
+    def write_frame(self, name, df, chunk_rows=100000):
+        """Write a DataFrame, converting it to cell values chunk_rows rows at a time"""
+        chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+        return self.write_chunks(name, list(df.columns), chunks)
+
+    def close(self):
+        self.workbook.close()
+        return self.path
@@ -0,0 +1,338 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import csv
+import hashlib
+import io
+import os
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from compact_results import has_current_compact, read_meta
+
+TABLE_CACHE_DIR = os.path.join("cache", "tables")
+READ_CHUNK_BYTES = 16 * 1024 * 1024
+READ_CHUNK_ROWS = 200000
+FILTER_COLUMNS = ['day', 'category', 'match_status']
+
+def excel_to_csv(path, cache_dir=TABLE_CACHE_DIR):
+    """Stream the first sheet of an Excel file into a cached CSV, keyed by path and mtime"""
+    stat = os.stat(path)
+    key = hashlib.sha1(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8')).hexdigest()
+    csv_path = os.path.join(cache_dir, key + '.csv')
+    if os.path.exists(csv_path):
+        return csv_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    workbook = load_workbook(path, read_only=True)
+    try:
+        with open(csv_path + '.tmp', 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                writer.writerow(['' if value is None else str(value).replace('\n', ' ') for value in row])
+    finally:
+        workbook.close()
+    os.replace(csv_path + '.tmp', csv_path)
+    return csv_path
+
+class CsvTable:
+    """
+    Row-addressable view of a CSV file. Only the byte offset of each row is kept in
+    memory; rows are parsed when they are requested. Rows must not contain line breaks.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            self.columns = next(csv.reader(f), [])
+        self.offsets = self._index_rows()
+
+    def _index_rows(self):
+        # Find every line start with chunked binary reads
+        offsets = []
+        position = 0
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord('\n'))
+                offsets.append(newlines.astype(np.int64) + position + 1)
+                position += len(chunk)
+        offsets = np.concatenate(offsets) if offsets else np.empty(0, dtype=np.int64)
+        # The first line is the header and a trailing newline does not start a row
+        return offsets[offsets < position]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def rows(self, positions):
+        """Read the rows at the given positions"""
+        rows = []
+        with open(self.path, 'rb') as f:
+            for position in positions:
+                f.seek(self.offsets[position])
+                line = f.readline().decode('utf-8').rstrip('\r\n')
+                rows.append(next(csv.reader(io.StringIO(line)), []))
+        return rows
+
+    def iter_column_chunks(self, columns):
+        return pd.read_csv(self.path, usecols=columns, chunksize=READ_CHUNK_ROWS, dtype=str, keep_default_na=False)
+
+    def unique_values(self, column, limit=1000):
+        """Distinct values of a column, read chunk by chunk"""
+        values = set()
+        for chunk in self.iter_column_chunks([column]):
+            values.update(chunk[column].unique())
+            if len(values) > limit:
+                break
+        return sorted(values, key=_sort_key)
+
+    def filter_positions(self, filters):
+        """Positions of the rows whose columns equal the given {column: value} filters"""
+        if not filters:
+            return np.arange(len(self))
+        matches = []
+        start = 0
+        for chunk in self.iter_column_chunks(list(filters)):
+            mask = np.ones(len(chunk), dtype=bool)
+            for column, value in filters.items():
+                mask &= (chunk[column] == value).to_numpy()
+            matches.append(np.flatnonzero(mask) + start)
+            start += len(chunk)
+        return np.concatenate(matches) if matches else np.empty(0, dtype=np.int64)
+
+    def sort_positions(self, positions, column, ascending=True):
+        """Reorder positions by one column, numerically when the column is numeric"""
+        values = pd.concat([chunk[column] for chunk in self.iter_column_chunks([column])], ignore_index=True)
+        numeric = pd.to_numeric(values, errors='coerce')
+        keys = numeric if numeric.notna().sum() >= values.ne('').sum() else values
+        keys = keys.to_numpy()[positions]
+        order = pd.Series(keys).sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        return positions[order]
+
+class CompactTable:
+    """
+    The same row-addressable view over a compact .npy copy written by save_compact.
+    Columns are memory-mapped, category columns already list their distinct values,
+    and filters and sorts work on the stored codes and numbers directly.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.meta = read_meta(path)
+        self.columns = list(self.meta['columns'])
+        self.arrays = {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r') for column in self.columns}
+        self.categories = {
+            column: info['categories'] for column, info in self.meta['columns'].items() if info['kind'] == 'category'
+        }
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def _text(self, column, values):
+        if column in self.categories:
+            categories = self.categories[column]
+            return ['' if code < 0 else categories[code] for code in values.tolist()]
+        if values.dtype.kind == 'f':
+            return ['' if np.isnan(value) else str(value) for value in values]
+        return [str(value) for value in values]
+
+    def rows(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        columns = [self._text(column, np.asarray(self.arrays[column][positions])) for column in self.columns]
+        return [list(row) for row in zip(*columns)]
+
+    def unique_values(self, column, limit=1000):
+        if column in self.categories:
+            values = self.categories[column]
+        else:
+            values = self._text(column, np.unique(np.asarray(self.arrays[column])))
+        return sorted(values[:limit + 1], key=_sort_key)
+
+    def filter_positions(self, filters):
+        mask = np.ones(len(self), dtype=bool)
+        for column, value in filters.items():
+            values = np.asarray(self.arrays[column])
+            if column in self.categories:
+                categories = self.categories[column]
+                mask &= values == (categories.index(value) if value in categories else -2)
+            else:
+                mask &= values == float(value)
+        return np.flatnonzero(mask)
+
+    def sort_positions(self, positions, column, ascending=True):
+        keys = np.asarray(self.arrays[column][positions])
+        if column in self.categories:
+            # Categories are stored sorted, so codes order like the strings; -1 is a blank
+            keys = np.where(keys < 0, np.nan, keys.astype(float))
+        order = pd.Series(keys).sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        return positions[order]
+
+def _sort_key(value):
+    try:
+        return (0, float(value), value)
+    except ValueError:
+        return (1, 0, value)
+
+def compact_dir_for(path):
+    """The compact copy save_compact writes next to a results workbook (same name, no extension)"""
+    return os.path.splitext(path)[0]
+
+def open_table(path):
+    """Open a results file, preferring a current compact copy over converting the workbook"""
+    if path.lower().endswith('.xlsx'):
+        if has_current_compact(path, compact_dir_for(path)):
+            return CompactTable(compact_dir_for(path))
+        path = excel_to_csv(path)
+    return CsvTable(path)
+
+def load_table(path):
+    """Open a table and read the values of its filter columns; slow for big workbooks, so run off the Tk thread"""
+    table = open_table(path)
+    filter_values = {column: table.unique_values(column) for column in FILTER_COLUMNS if column in table.columns}
+    return table, filter_values
+
+class ResultsViewer:
+    """
+    Table window that only materializes the rows currently on screen.
+    The file is opened on a worker thread while the window shows a loading state, so
+    converting a large workbook or scanning its filter columns never blocks the UI.
+    """
+    def __init__(self, parent, path):
+        self.path = path
+        self.table = None
+        self.positions = np.empty(0, dtype=np.int64)
+        self.first_row = 0
+        self.sort_column = None
+        self.sort_ascending = True
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(f"Results - {os.path.basename(path)}")
+        self.window.geometry("1000x600")
+
+        self.filter_frame = ttk.Frame(self.window, padding=8)
+        self.filter_frame.pack(fill=tk.X)
+        self.filter_vars = {}
+        self.count_var = tk.StringVar(value=f"Loading {os.path.basename(path)}...")
+        ttk.Label(self.filter_frame, textvariable=self.count_var).pack(side=tk.RIGHT)
+        self.table_frame = ttk.Frame(self.window)
+        self.table_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
+        ttk.Button(self.window, text="Close", command=self.window.destroy).pack(pady=5)
+
+        self.loaded = queue.Queue()
+        threading.Thread(target=self.load, daemon=True).start()
+        self.window.after(100, self.check_loaded)
+
+    def load(self):
+        try:
+            self.loaded.put(load_table(self.path))
+        except Exception as e:
+            self.loaded.put(e)
+
+    def check_loaded(self):
+        if not self.window.winfo_exists():
+            return
+        try:
+            result = self.loaded.get_nowait()
+        except queue.Empty:
+            self.window.after(100, self.check_loaded)
+            return
+        if isinstance(result, Exception):
+            messagebox.showerror("Error", f"Could not open {os.path.basename(self.path)}: {str(result)}")
+            self.window.destroy()
+            return
+        self.build(*result)
+
+    def build(self, table, filter_values):
+        self.table = table
+        self.positions = np.arange(len(table))
+        for column, values in filter_values.items():
+            ttk.Label(self.filter_frame, text=f"{column}:").pack(side=tk.LEFT)
+            var = tk.StringVar(value="All")
+            box = ttk.Combobox(self.filter_frame, textvariable=var, state="readonly", width=16,
+                               values=["All"] + values)
+            box.pack(side=tk.LEFT, padx=(0, 12))
+            box.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+            self.filter_vars[column] = var
+
+        self.tree = ttk.Treeview(self.table_frame, columns=table.columns, show="headings")
+        for column in table.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=120, stretch=False)
+        self.scrollbar = ttk.Scrollbar(self.table_frame, orient=tk.VERTICAL, command=self.on_scroll)
+        x_scrollbar = ttk.Scrollbar(self.table_frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=x_scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.tree.bind("<Configure>", lambda e: self.render())
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_rows(-1 if e.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-1) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(1) or "break")
+        self.tree.bind("<Up>", lambda e: self.scroll_rows(-1) or "break")
+        self.tree.bind("<Down>", lambda e: self.scroll_rows(1) or "break")
+        self.tree.bind("<Prior>", lambda e: self.scroll_rows(-self.visible_rows()) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll_rows(self.visible_rows()) or "break")
+        self.render()
+
+    def visible_rows(self):
+        row_height = 20
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+    def scroll_rows(self, count):
+        self.first_row += count
+        self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.first_row = int(float(amount) * len(self.positions))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.first_row += int(amount) * step
+        self.render()
+
+    def render(self):
+        total = len(self.positions)
+        page_size = self.visible_rows()
+        self.first_row = max(0, min(self.first_row, total - page_size))
+        page = self.positions[self.first_row:self.first_row + page_size]
+
+        self.tree.delete(*self.tree.get_children())
+        for row in self.table.rows(page):
+            self.tree.insert("", tk.END, values=row)
+
+        if total:
+            self.scrollbar.set(self.first_row / total, (self.first_row + len(page)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_var.set(f"{total:,} of {len(self.table):,} rows")
+
+    def apply_filters(self):
+        filters = {column: var.get() for column, var in self.filter_vars.items() if var.get() != "All"}
+        self.positions = self.table.filter_positions(filters)
+        if self.sort_column:
+            self.positions = self.table.sort_positions(self.positions, self.sort_column, self.sort_ascending)
+        self.first_row = 0
+        self.render()
+
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_ascending = not self.sort_ascending
+        else:
+            self.sort_column = column
+            self.sort_ascending = True
+        self.positions = self.table.sort_positions(self.positions, column, self.sort_ascending)
+        for name in self.table.columns:
+            arrow = (" ▲" if self.sort_ascending else " ▼") if name == column else ""
+            self.tree.heading(name, text=name + arrow)
+        self.first_row = 0
+        self.render()
+
+def show_results(parent, path):
+    # Errors while reading the file are reported by the viewer once loading finishes
+    try:
+        return ResultsViewer(parent, path)
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not open {os.path.basename(path)}: {str(e)}")
+        return None
@@ -0,0 +1,210 @@
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+import pandas as pd
+from recipes_vbg_2 import parse_amount, parse_recipe_page, discover_recipe_links, collect_sitemap_recipes
+from price_scraper import parse_pack_size, parse_product_listing, normalize_products, select_offers, load_into_catalog
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (ingredient line, expected (amount, unit))
+AMOUNT_CASES = [
+    ("1/2 su bardağı süt", (0.5, 'su bardağı')),
+    ("1 / 2 su bardağı süt", (0.5, 'su bardağı')),
+    ("1 1/2 su bardağı un", (1.5, 'su bardağı')),
+    ("1 1 / 2 su bardağı un", (1.5, 'su bardağı')),
+    ("½ çay kaşığı tuz", (0.5, 'çay kaşığı')),
+    ("2-3 adet domates", (2.5, 'adet')),
+    ("1 / 2 - 1 çay kaşığı karabiber", (0.75, 'çay kaşığı')),
+    ("yarım demet maydanoz", (0.5, 'demet')),
+    ("iki buçuk su bardağı su", (2.5, 'su bardağı')),
+    ("250 gr kıyma", (250, 'g')),
+    ("tuz", (1, '')),
+]
+
+def check_amounts():
+    """Failures of parse_amount on AMOUNT_CASES as (case, message) pairs"""
+    failures = []
+    for text, expected in AMOUNT_CASES:
+        try:
+            result = parse_amount(text)
+        except Exception as e:
+            failures.append((text, f"raised {e!r}"))
+            continue
+        if abs(result[0] - expected[0]) > 1e-9 or result[1] != expected[1]:
+            failures.append((text, f"got {result}, expected {expected}"))
+    return failures
+
+# (product title, expected (amount, unit))
+PACK_CASES = [
+    ("Sütaş Süt 1 L", (1, 'lt')),
+    ("Pınar Süt 2x1 L", (2, 'lt')),
+    ("Coca Cola 6'lı 330 ml", (1.98, 'lt')),
+    ("Yumurta 30'lu 63-72 g", (2.025, 'kg')),
+    ("Sucuk 2-3 kg", (2.5, 'kg')),
+    ("Yumurta 10'lu", (10, 'adet')),
+    ("Un 5 kg", (5, 'kg')),
+    ("Domates Kg", (1, 'kg')),
+    ("Maydanoz Demet", (None, None)),
+]
+
+def check_pack_sizes():
+    failures = []
+    for title, expected in PACK_CASES:
+        result = parse_pack_size(title)
+        if expected[0] is None:
+            matches = result == expected
+        else:
+            matches = result[0] is not None and abs(result[0] - expected[0]) < 1e-9 and result[1] == expected[1]
+        if not matches:
+            failures.append((title, f"got {result}, expected {expected}"))
+    return failures
+
+def _listing(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return parse_product_listing(f.read(), "https://www.cimri.com/arama?q=x")
+
+def check_listings():
+    """parse_product_listing on the JSON-LD and the CSS-only listing fixtures"""
+    failures = []
+    found = [(p['title'], p['price'], p['url']) for p in _listing("listing_jsonld.html")]
+    expected = [
+        ("Sütaş Süt 1 L", 42.5, "https://www.cimri.com/market/sutas-sut-1-l"),
+        ("Pınar Süt 2x1 L", 89.9, "https://www.cimri.com/market/pinar-sut-2x1-l"),
+        ("Torku Süt 500 ml", 24.0, "https://www.cimri.com/market/torku-sut-500-ml"),
+        ("Süt Tozu 1 kg", 349.9, "https://www.cimri.com/market/sut-tozu-1-kg"),
+        ("Kakaolu Gofret 40 g", 12.5, "https://www.cimri.com/market/kakaolu-gofret-40-g"),
+    ]
+    if found != expected:
+        failures.append(("listing_jsonld.html", f"got {found}"))
+    # The product-list container must not come back as a copy of its first card
+    found = [(p['title'], p['price'], p['url']) for p in _listing("listing_css.html")]
+    expected = [
+        ("Köy Yumurtası 30'lu 63-72 g", 189.9, "https://www.cimri.com/market/koy-yumurtasi-30lu"),
+        ("Yumurta 10'lu", 69.5, "https://www.cimri.com/market/yumurta-10lu"),
+    ]
+    if found != expected:
+        failures.append(("listing_css.html", f"got {found}"))
+    return failures
+
+def _fixture_offers():
+    return pd.DataFrame(
+        normalize_products(_listing("listing_jsonld.html"), "Süt")
+        + normalize_products(_listing("listing_css.html"), "Yumurta")
+    )
+
+def check_select_offers():
+    """select_offers keeps titles with every ingredient word and the usual unit, then takes the median offer"""
+    selected = select_offers(_fixture_offers())
+    found = [(r.Ingredient, r.product, r.amount, r.unit) for r in selected.itertuples()]
+    # Süt: the gofret lacks the word and "Süt Tozu" is priced per kg; 44.95 TL/lt is the median.
+    # Yumurta: one offer per unit, the tie goes to the first unit in sort order
+    expected = [("Süt", "Pınar Süt 2x1 L", 2.0, 'lt'), ("Yumurta", "Yumurta 10'lu", 10.0, 'adet')]
+    if found != expected:
+        return [("selected", f"got {found}")]
+    return []
+
+def check_load_into_catalog():
+    """load_into_catalog updates known ingredients, keeps the others and appends new ones"""
+    selected = select_offers(_fixture_offers())
+    with tempfile.TemporaryDirectory() as folder:
+        catalog_file = os.path.join(folder, "catalog.xlsx")
+        pd.DataFrame({
+            'Ingredient': ["süt ", "Un"], 'price': [40.0, 35.0], 'amount': [1.0, 1.0], 'unit': ['lt', 'kg'],
+        }).to_excel(catalog_file, index=False)
+        output_file = os.path.join(folder, "updated.xlsx")
+        with redirect_stdout(io.StringIO()):
+            load_into_catalog(selected, catalog_file, output_file)
+        catalog = pd.read_excel(output_file)
+    found = [(r.Ingredient.strip(), r.price, r.amount, r.unit) for r in catalog.itertuples()]
+    expected = [("süt", 89.9, 2.0, 'lt'), ("Un", 35.0, 1.0, 'kg'), ("Yumurta", 69.5, 10.0, 'adet')]
+    if found != expected:
+        return [("catalog", f"got {found}")]
+    return []
+
+def check_recipe_page():
+    """parse_recipe_page on the saved page in fixtures/recipe_page.html"""
+    with open(os.path.join(FIXTURE_DIR, "recipe_page.html"), 'r', encoding='utf-8') as f:
+        recipe = parse_recipe_page(f.read(), "https://ye-mek.net/tarif/menemen", "Menemen")
+    expected = [
+        ("3 adet yumurta", 3, 'adet'),
+        ("2 adet domates", 2, 'adet'),
+        ("1 1 / 2 adet yeşil biber", 1.5, 'adet'),
+        ("2 yemek kaşığı zeytinyağı", 2, 'yemek kaşığı'),
+        ("Tuz", 1, ''),
+    ]
+    failures = []
+    if recipe['title'] != "Menemen":
+        failures.append(("title", f"got {recipe['title']!r}"))
+    found = [(i['text'], i['amount'], i['unit']) for i in recipe['ingredients']]
+    if found != expected:
+        failures.append(("ingredients", f"got {found}"))
+    if len(recipe['instructions']) != 3:
+        failures.append(("instructions", f"got {len(recipe['instructions'])} steps, expected 3"))
+    if recipe['categories'] != ['kahvaltiliklar']:
+        failures.append(("categories", f"got {recipe['categories']}"))
+    return failures
+
+def check_sitemap():
+    """discover_recipe_links and collect_sitemap_recipes on fixtures/sitemap.xml, without any requests"""
+    sitemap = os.path.join(FIXTURE_DIR, "sitemap.xml")
+    failures = []
+
+    links = discover_recipe_links(sitemap)
+    found = [(link['name'], link['categories'], link['changed']) for link in links]
+    expected = [("Menemen", None, True), ("Karniyarik", None, True), ("Mercimek Koftesi", None, True)]
+    if found != expected:
+        failures.append(("first run", f"got {found}"))
+
+    # Categories learned from the pages; karnıyarık changed since the last run
+    state = {
+        "https://ye-mek.net/tarif/menemen": {
+            'lastmod': "2026-03-01", 'categories': ['kahvaltiliklar'], 'recipe': {'title': "Menemen"}},
+        "https://ye-mek.net/tarif/karniyarik": {
+            'lastmod': "2026-01-05", 'categories': ['et-yemekleri'], 'recipe': {'title': "Karnıyarık"}},
+    }
+    links = discover_recipe_links(sitemap, categories=['kahvaltiliklar'], state=state)
+    found = [(link['name'], link['categories'], link['changed']) for link in links]
+    expected = [("Menemen", ['kahvaltiliklar'], False), ("Mercimek Koftesi", None, True)]
+    if found != expected:
+        failures.append(("category filter", f"got {found}"))
+
+    links = discover_recipe_links(sitemap, since="2026-02-01", state=state)
+    found = [(link['name'], link['changed']) for link in links]
+    expected = [("Menemen", False), ("Karniyarik", True), ("Mercimek Koftesi", False)]
+    if found != expected:
+        failures.append(("--since", f"got {found}"))
+
+    # Nothing is queued, so no page is fetched and the known recipe comes from the state
+    unchanged = [link for link in links if not link['changed']]
+    breakfast, main_course, fetched = collect_sitemap_recipes(unchanged, state, breakfast_count=1, main_course_count=1)
+    if fetched or [r['title'] for r in breakfast] != ["Menemen"] or main_course:
+        failures.append(("collect", f"fetched {fetched}, got {breakfast} / {main_course}"))
+    return failures
+
+CHECKS = [
+    ("parse_amount", check_amounts),
+    ("parse_pack_size", check_pack_sizes),
+    ("parse_product_listing", check_listings),
+    ("select_offers", check_select_offers),
+    ("load_into_catalog", check_load_into_catalog),
+    ("parse_recipe_page", check_recipe_page),
+    ("sitemap", check_sitemap),
+]
+
+def main():
+    # Usage: python scraper_checks.py
+    failed = 0
+    for name, check in CHECKS:
+        failures = check()
+        print(f"{'PASS' if not failures else 'FAIL'}  {name}")
+        for case, message in failures:
+            print(f"      {case}: {message}")
+        failed += bool(failures)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
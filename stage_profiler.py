@@ -0,0 +1,160 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_DIR = os.path.join("output", "profiles")
+PROFILE_FLAG = '--profile'
+TOP_N = 20
+SAMPLE_INTERVAL = 0.005
+
+_active = None
+
+class StageProfiler:
+    """
+    Profiles a run stage by stage.
+    Each stage gets its own cProfile (exact call counts and times, saved as .pstats) and the
+    samples of a background stack sampler (saved as collapsed stacks, one 'a;b;c count' line
+    per stack, ready for flamegraph.pl or speedscope). Time outside any named stage is
+    collected under 'other'.
+    """
+    def __init__(self, run_name, output_dir=PROFILE_DIR, interval=SAMPLE_INTERVAL):
+        self.run_name = run_name
+        self.output_dir = os.path.join(output_dir, f"{run_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.interval = interval
+        self.profiles = {}
+        self.wall_times = defaultdict(float)
+        self.samples = defaultdict(Counter)
+        self.order = []
+        self.stack = []
+        self.thread_id = threading.get_ident()
+        self.sampler = None
+        self.running = False
+
+    def _profile(self, name):
+        if name not in self.profiles:
+            self.profiles[name] = cProfile.Profile()
+            self.order.append(name)
+        return self.profiles[name]
+
+    def _enter(self, name):
+        if self.stack:
+            outer, started = self.stack[-1]
+            self.profiles[outer].disable()
+            self.wall_times[outer] += time.perf_counter() - started
+        self.stack.append((name, time.perf_counter()))
+        self._profile(name).enable()
+
+    def _exit(self):
+        name, started = self.stack.pop()
+        self.profiles[name].disable()
+        self.wall_times[name] += time.perf_counter() - started
+        if self.stack:
+            outer, _ = self.stack[-1]
+            self.stack[-1] = (outer, time.perf_counter())
+            self.profiles[outer].enable()
+
+    @contextmanager
+    def stage(self, name):
+        # Stages only nest on the profiled thread; worker threads run unprofiled
+        if threading.get_ident() != self.thread_id:
+            yield
+            return
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def _sample(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None and self.stack:
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[self.stack[-1][0]][';'.join(reversed(frames))] += 1
+            time.sleep(self.interval)
+
+    def start(self):
+        self.running = True
+        self.sampler = threading.Thread(target=self._sample, daemon=True)
+        self.sampler.start()
+        self._enter('other')
+
+    def stop(self):
+        while self.stack:
+            self._exit()
+        self.running = False
+        self.sampler.join()
+
+    def save(self):
+        """Write <stage>.pstats and <stage>.folded for every stage. Returns the output directory"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        for position, name in enumerate(self.order, 1):
+            base = os.path.join(self.output_dir, f"{position:02d}_{name.replace(' ', '_')}")
+            self.profiles[name].dump_stats(base + '.pstats')
+            with open(base + '.folded', 'w', encoding='utf-8') as f:
+                for stack, count in self.samples[name].most_common():
+                    f.write(f"{stack} {count}\n")
+        return self.output_dir
+
+    def hot_functions(self, top_n=TOP_N):
+        """(stage, ncalls, tottime, cumtime, function) rows with the highest own time across stages"""
+        rows = []
+        for name in self.order:
+            stats = pstats.Stats(self.profiles[name])
+            for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+                location = f"{os.path.basename(filename)}:{line}" if line else filename
+                rows.append((name, ncalls, tottime, cumtime, f"{function} ({location})"))
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:top_n]
+
+    def report(self, top_n=TOP_N):
+        lines = ["=== PROFILE: STAGE WALL TIMES ==="]
+        for name in self.order:
+            lines.append(f"{name:<28} {self.wall_times[name]:9.3f} s")
+        lines.append(f"\n=== TOP {top_n} FUNCTIONS BY OWN TIME ===")
+        lines.append(f"{'stage':<20} {'ncalls':>10} {'tottime':>9} {'cumtime':>9}  function")
+        for name, ncalls, tottime, cumtime, function in self.hot_functions(top_n):
+            lines.append(f"{name[:20]:<20} {ncalls:>10} {tottime:9.3f} {cumtime:9.3f}  {function}")
+        return '\n'.join(lines)
+
+@contextmanager
+def stage(name):
+    """Mark a pipeline stage. Costs nothing unless the run was started with --profile"""
+    if _active is None:
+        yield
+        return
+    with _active.stage(name):
+        yield
+
+def run_main(main, run_name):
+    """
+    Entry point wrapper: runs main() normally, or profiled when --profile is on the
+    command line. The flag is removed from sys.argv so the scripts' positional
+    arguments keep working.
+    """
+    global _active
+    if PROFILE_FLAG not in sys.argv:
+        return main()
+    sys.argv = [arg for arg in sys.argv if arg != PROFILE_FLAG]
+    _active = StageProfiler(run_name)
+    _active.start()
+    try:
+        return main()
+    finally:
+        profiler, _active = _active, None
+        profiler.stop()
+        output_dir = profiler.save()
+        report = profiler.report()
+        with open(os.path.join(output_dir, "summary.txt"), 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+        print('\n' + report)
+        print(f"\nProfile saved to: {output_dir}")
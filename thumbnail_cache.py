@@ -0,0 +1,69 @@
+import hashlib
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+THUMBNAIL_CACHE_DIR = os.path.join("cache", "thumbnails")
+THUMBNAIL_WIDTH = 700
+
+class ThumbnailCache:
+    """
+    Resized copies of the plot images, kept in memory and on disk and keyed by
+    file path and modification time, so a chart is only decoded again after it changes.
+    """
+    def __init__(self, cache_dir=THUMBNAIL_CACHE_DIR, max_width=THUMBNAIL_WIDTH, max_workers=4):
+        self.cache_dir = cache_dir
+        self.max_width = max_width
+        self.memory = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def key(self, path):
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{self.max_width}"
+
+    def get(self, path):
+        """Return the thumbnail as a PIL image, creating and caching it if needed"""
+        key = self.key(path)
+        with self.lock:
+            if key in self.memory:
+                return self.memory[key]
+
+        disk_file = os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.png')
+        if os.path.exists(disk_file):
+            image = Image.open(disk_file)
+            image.load()
+        else:
+            image = Image.open(path)
+            if image.width > self.max_width:
+                ratio = self.max_width / image.width
+                image = image.resize((self.max_width, int(image.height * ratio)), Image.Resampling.LANCZOS)
+            else:
+                image.load()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            image.save(disk_file + '.tmp.png')
+            os.replace(disk_file + '.tmp.png', disk_file)
+
+        with self.lock:
+            self.memory[key] = image
+        return image
+
+    def load_async(self, paths):
+        """
+        Start loading thumbnails on worker threads.
+        Returns a queue that receives (path, image, error) as each one finishes;
+        Tk widgets must be created from that queue on the Tk thread.
+        """
+        results = queue.Queue()
+
+        def load(path):
+            try:
+                results.put((path, self.get(path), None))
+            except Exception as e:
+                results.put((path, None, e))
+
+        for path in paths:
+            self.executor.submit(load, path)
+        return results
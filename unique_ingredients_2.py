@@ -1,13 +1,11 @@
 import json
 import re
 from openpyxl import Workbook
+from stage_profiler import run_main
+from unit_registry import load_registry
 
-REMOVE_WORDS = [
-    "az", "dolusu", "biraz", "bir", "yarım", "çeyrek", "orta", "büyük", "küçük", "silme",
-    "adet", "orta boy", "baş", "gr", "g", "kg", "yemek kaşığı", "çay kaşığı",
-    "su bardağı", "tatlı kaşığı", "paket", "dilim", "bardak", "kaşık", "fincan",
-    "çorba kaşığı", "küçük boy", "büyük boy", "tane", "diş", "kase", "avuç", "demet", "tutam", "parça", "bardağı"
-]
+# Quantity words and unit spellings stripped from ingredient names
+REMOVE_WORDS = load_registry().remove_words
 PHRASES_TO_REMOVE = [
     "üzeri için", "sosu için", "sos için"
 ]
@@ -33,28 +31,32 @@ def clean_ingredient(text):
     text = re.sub(r"\s+", " ", text).strip(" :")
     return text
 
-with open('meal_plan.json', 'r', encoding='utf-8') as f:
-    meal_plan = json.load(f)
+def main():
+    with open('meal_plan.json', 'r', encoding='utf-8') as f:
+        meal_plan = json.load(f)
+
+    unique_ingredients = set()
 
-unique_ingredients = set()
+    for category in meal_plan.values():
+        for recipe in category:
+            for ingredient in recipe.get('ingredients', []):
+                text = ingredient.get('text', '').strip()
+                if text:
+                    cleaned = clean_ingredient(text)
+                    if cleaned:
+                        unique_ingredients.add(cleaned)
 
-for category in meal_plan.values():
-    for recipe in category:
-        for ingredient in recipe.get('ingredients', []):
-            text = ingredient.get('text', '').strip()
-            if text:
-                cleaned = clean_ingredient(text)
-                if cleaned:
-                    unique_ingredients.add(cleaned)
+    # Write to Excel
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Unique Ingredients"
+    ws.append(["Ingredient"])
 
-# Write to Excel
-wb = Workbook()
-ws = wb.active
-ws.title = "Unique Ingredients"
-ws.append(["Ingredient"])
+    for ingredient in sorted(unique_ingredients):
+        ws.append([ingredient])
 
-for ingredient in sorted(unique_ingredients):
-    ws.append([ingredient])
+    wb.save("unique_ingredients.xlsx")
+    print("Unique ingredients have been written to unique_ingredients.xlsx")
 
-wb.save("unique_ingredients.xlsx")
-print("Unique ingredients have been written to unique_ingredients.xlsx") 
\ No newline at end of file
+if __name__ == "__main__":
+    run_main(main, "unique_ingredients_2")
\ No newline at end of file
@@ -0,0 +1,195 @@
+import json
+import os
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "input_created", "unit_registry.json")
+_LETTER = 'a-zçğıöşüâîû'
+
+def _keyword_pattern(keywords, word_start=False):
+    """One alternation over all keywords, longest first, so a single scan finds the most specific one"""
+    if not keywords:
+        return None
+    prefix = rf"(?<![{_LETTER}])" if word_start else ""
+    return re.compile(prefix + "(?:" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + ")")
+
+class UnitRegistry:
+    """
+    Unit sizes, piece weights and densities from input_created/unit_registry.json.
+
+    Everything is compiled once: unit spellings into a dict of canonical names, units
+    into integer codes with per-code size arrays, and the density keywords into
+    a single regex. Keyword lookups are memoized per ingredient text, so costing a plan
+    does one dict lookup per line however many weights and densities the file holds.
+
+    Piece weights resolve to the first keyword in file order found in the ingredient
+    text, as ADET_TO_GRAM always did, so "kapya biber" weighs as "biber" (40 g).
+    Densities (g/ml) resolve to the longest keyword and only match at the start of a
+    word since their keys are short.
+    Liquids and solids match anywhere in the text, as KNOWN_LIQUIDS and
+    SOLID_INGREDIENTS did, so "su" also marks "2 su bardağı un" as a liquid.
+
+    Densities only bridge kg and lt when the file sets "density_bridge"; it is off,
+    so a volume priced by weight stays a unit mismatch and the published costs hold.
+    Turning it on is a costing change of its own, and the values must keep a source.
+    """
+    def __init__(self, data):
+        self.data = data
+        units = data['units']
+        self.unit_aliases = {}
+        for unit, info in units.items():
+            self.unit_aliases[unit] = unit
+            for alias in info.get('aliases', []):
+                self.unit_aliases[alias] = unit
+        self.unit_grams = {u: info['grams'] for u, info in units.items() if 'grams' in info}
+        self.unit_ml = {u: info['ml'] for u, info in units.items() if 'ml' in info}
+        self.base_units = {u: (info['base'], info['per_base']) for u, info in units.items() if 'base' in info}
+        self.piece_weights = dict(data.get('piece_weights', {}))
+        self.densities = dict(data.get('densities', {}))
+        self.density_bridge = bool(data.get('density_bridge', False))
+        self.liquids = list(data.get('liquids', []))
+        self.solids = list(data.get('solids', []))
+        self.unitless_defaults = [(rule['keywords'], rule['amount'], rule['unit']) for rule in data.get('unitless_defaults', [])]
+        self.unitless_liquid = (data['unitless_liquid']['amount'], data['unitless_liquid']['unit'])
+        self.unitless_solid = (data['unitless_solid']['amount'], data['unitless_solid']['unit'])
+        self.remove_words = list(data.get('remove_words', []))
+
+        # Unit code tables: code 0 is "unknown unit"
+        self.unit_names = [''] + list(units)
+        self.unit_codes = {unit: code for code, unit in enumerate(self.unit_names)}
+        self.unit_grams_array = np.array([self.unit_grams.get(u, np.nan) for u in self.unit_names])
+        self.unit_ml_array = np.array([self.unit_ml.get(u, np.nan) for u in self.unit_names])
+        self.per_base_array = np.array([self.base_units.get(u, (None, np.nan))[1] for u in self.unit_names], dtype=float)
+        self.base_of_code = np.array([self.base_units.get(u, ('', None))[0] for u in self.unit_names], dtype=object)
+
+        self._density_pattern = _keyword_pattern(self.densities, word_start=True)
+        self._ingredient_info = {}
+
+    @classmethod
+    def load(cls, path=REGISTRY_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def canonical_unit(self, unit):
+        return self.unit_aliases.get(unit, unit)
+
+    @staticmethod
+    def _longest(pattern, text):
+        if pattern is None:
+            return None
+        matches = pattern.findall(text)
+        return max(matches, key=len) if matches else None
+
+    def ingredient_info(self, ingredient_name):
+        """(is_liquid, unitless (amount, unit) or None, piece grams or nan, density or nan), memoized"""
+        info = self._ingredient_info.get(ingredient_name)
+        if info is not None:
+            return info
+        is_liquid = any(l in ingredient_name for l in self.liquids)
+        is_solid = any(s in ingredient_name for s in self.solids)
+        unitless = None
+        for keywords, amount, unit in self.unitless_defaults:
+            if any(k in ingredient_name for k in keywords):
+                unitless = (amount, unit)
+                break
+        if unitless is None and is_liquid:
+            unitless = self.unitless_solid if is_solid else self.unitless_liquid
+        piece = next((key for key in self.piece_weights if key in ingredient_name), None)
+        density = self._longest(self._density_pattern, ingredient_name)
+        info = (
+            is_liquid and not is_solid,
+            unitless,
+            float(self.piece_weights[piece]) if piece else np.nan,
+            float(self.densities[density]) if density else np.nan,
+        )
+        self._ingredient_info[ingredient_name] = info
+        return info
+
+    def piece_grams(self, ingredient_name):
+        return self.ingredient_info(ingredient_name)[2]
+
+    def density(self, ingredient_name):
+        return self.ingredient_info(ingredient_name)[3]
+
+    def convert_density(self, amount, unit, ingredient_name, price_unit):
+        """Bridge kg and lt with the ingredient's density; returns (amount, unit) unchanged when unknown"""
+        if not self.density_bridge or amount is None or unit == price_unit or {unit, price_unit} != {'kg', 'lt'}:
+            return amount, unit
+        density = self.density(ingredient_name)
+        if np.isnan(density):
+            return amount, unit
+        return (amount * density, 'kg') if unit == 'lt' else (amount / density, 'lt')
+
+    def convert_many(self, amounts, units, ingredient_names, price_units):
+        """
+        Vectorized convert_to_kg_or_lt for many lines at once.
+        Returns (converted amounts, final units) as arrays; NaN and '' where conversion fails.
+        Ingredient keyword checks run once per distinct text, the rest is array arithmetic.
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        price_units = np.asarray(price_units, dtype=object)
+        if price_units.ndim == 0:
+            price_units = np.full(len(amounts), price_units.item(), dtype=object)
+        # Hash-factorize units and names so the per-value work runs once per distinct value
+        unit_pos, unit_values = pd.factorize(pd.Series(units, dtype=object).fillna(''))
+        codes = np.array([self.unit_codes.get(u, 0) for u in unit_values], dtype=np.int64)[unit_pos]
+        no_unit = np.array([not u for u in unit_values], dtype=bool)[unit_pos]
+
+        name_pos, names = pd.factorize(pd.Series(ingredient_names, dtype=object))
+        infos = [self.ingredient_info(name) for name in names]
+        is_liquid = np.array([info[0] for info in infos], dtype=bool)[name_pos]
+        piece_grams = np.array([info[2] for info in infos])[name_pos]
+        density = np.array([info[3] for info in infos])[name_pos]
+        unitless_amount = np.array([info[1][0] if info[1] else np.nan for info in infos])[name_pos]
+        unitless_unit = np.array([info[1][1] if info[1] else '' for info in infos], dtype=object)[name_pos]
+
+        converted = np.full(len(amounts), np.nan)
+        final_unit = np.full(len(amounts), '', dtype=object)
+
+        # Kitchen units: grams for solids, millilitres for liquids (same operation order as the scalar path)
+        grams = self.unit_grams_array[codes]
+        ml = self.unit_ml_array[codes]
+        kitchen_mass = ~no_unit & ~np.isnan(grams) & ~is_liquid
+        kitchen_volume = ~no_unit & ~np.isnan(ml) & is_liquid
+        converted = np.where(kitchen_mass, amounts * grams / 1000, converted)
+        final_unit[kitchen_mass] = 'kg'
+        converted = np.where(kitchen_volume, amounts * ml / 1000, converted)
+        final_unit[kitchen_volume] = 'lt'
+
+        # Base units (g, kg, ml, lt) unless a kitchen rule already applied
+        kitchen = ~no_unit & (~np.isnan(grams) | ~np.isnan(ml))
+        base = self.base_of_code[codes]
+        weight_or_volume = ~kitchen & ((base == 'kg') | (base == 'lt'))
+        converted = np.where(weight_or_volume, amounts / self.per_base_array[codes], converted)
+        final_unit[weight_or_volume] = base[weight_or_volume]
+
+        # Pieces stay pieces when priced per piece, otherwise use the piece weight
+        pieces = ~kitchen & (base == 'adet')
+        per_piece = pieces & (price_units == 'adet')
+        converted = np.where(per_piece, amounts, converted)
+        final_unit[per_piece] = 'adet'
+        weighed = pieces & (price_units == 'kg') & ~np.isnan(piece_grams)
+        converted = np.where(weighed, amounts * piece_grams / 1000, converted)
+        final_unit[weighed] = 'kg'
+
+        # Lines without a unit get a fixed default amount
+        unitless = no_unit & ~np.isnan(unitless_amount)
+        converted = np.where(unitless, unitless_amount, converted)
+        final_unit[unitless] = unitless_unit[unitless]
+
+        # Densities bridge kg and lt when the price is in the other one
+        bridge = self.density_bridge & ~np.isnan(density)
+        to_kg = (final_unit == 'lt') & (price_units == 'kg') & bridge
+        to_lt = (final_unit == 'kg') & (price_units == 'lt') & bridge
+        converted = np.where(to_kg, converted * density, converted)
+        converted = np.where(to_lt, converted / np.where(to_lt, density, 1.0), converted)
+        final_unit[to_kg] = 'kg'
+        final_unit[to_lt] = 'lt'
+        return converted, final_unit
+
+@lru_cache(maxsize=None)
+def load_registry(path=REGISTRY_FILE):
+    """The registry for a data file, loaded and compiled once per process"""
+    return UnitRegistry.load(path)
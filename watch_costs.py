@@ -0,0 +1,216 @@
+import pandas as pd
+import numpy as np
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import matplotlib
+matplotlib.use('Agg')
+from main_model_old import load_price_data, build_matcher, build_cost_basis, recipe_key
+from recipe_cost_vectors import RecipeCostModel
+from calculate_daily_costs import build_daily_costs, create_visualizations, MEAL_KEYS
+from stage_profiler import run_main
+
+SUMMARY_FILE = os.path.join("output", "watch_summary.json")
+POLL_SECONDS = 0.25
+LINE_COLUMNS = ['meal_ingredient', 'recipe_amount', 'recipe_unit', 'score', 'price_idx', 'converted_amount']
+
+def file_signature(path):
+    """(mtime, size) of a file, or None while it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class CostWatcher:
+    """
+    Keeps the plan costed in memory and re-costs only what an input edit touches.
+
+    A price edit that keeps the catalog's names and units updates the unit prices of
+    the edited rows, which moves only the recipes using them. A new meal plan only
+    matches and converts the ingredient lines of recipes that were not costed before.
+    Catalog rows that are added, renamed or change unit alter the matching, so they
+    rebuild the matcher and the per-recipe lines.
+    """
+    def __init__(self, meal_plan_file, ingredients_file):
+        self.meal_plan_file = meal_plan_file
+        self.ingredients_file = ingredients_file
+        self.recipe_lines = {}
+        self.signatures = {}
+        self.load_prices(load_price_data(ingredients_file))
+        self.load_plan(self.read_plan())
+        self.signatures = {path: file_signature(path) for path in (meal_plan_file, ingredients_file)}
+
+    def read_plan(self):
+        with open(self.meal_plan_file, 'r', encoding='utf-8') as f:
+            return json.load(f)['meal_plan']
+
+    def load_prices(self, price_df):
+        """Fit the matcher on a new catalog; every recipe has to be matched again"""
+        self.price_df = price_df
+        self.vectorizer, self.price_vecs = build_matcher(price_df)
+        self.recipe_lines = {}
+
+    def lines_for(self, key, recipe):
+        """Matched and converted ingredient lines of one recipe, computed once per recipe version"""
+        lines = self.recipe_lines.get(key)
+        if lines is None:
+            basis = build_cost_basis([{'day': 0, 'meal': recipe}], self.price_df, self.vectorizer, self.price_vecs)
+            lines = self.recipe_lines[key] = basis[LINE_COLUMNS]
+        return lines
+
+    def load_plan(self, meal_plan):
+        """Build the cost model for a plan from cached recipe lines. Returns the number of newly costed recipes"""
+        known = len(self.recipe_lines)
+        meals = []
+        for day_obj in meal_plan:
+            for meal_type, recipe in day_obj.items():
+                if meal_type == 'day' or not recipe or not isinstance(recipe, dict):
+                    continue
+                key = recipe_key(recipe)
+                lines = self.lines_for(key, recipe)
+                meals.append(lines.assign(day=day_obj.get('day'), category=meal_type, recipe_name=key[0]))
+        basis = pd.concat(meals, ignore_index=True) if meals else pd.DataFrame(columns=MEAL_KEYS + LINE_COLUMNS)
+        self.meal_plan = meal_plan
+        self.model = RecipeCostModel.from_basis(basis, self.price_df)
+        return len(self.recipe_lines) - known
+
+    def update_prices(self, price_df):
+        """Apply an edited price sheet. Returns the names of the recipes whose cost changed"""
+        old = self.price_df
+        same_rows = (
+            len(price_df) == len(old)
+            and price_df['Ingredient_clean'].equals(old['Ingredient_clean'])
+            and price_df['unit'].str.strip().str.lower().equals(old['unit'].str.strip().str.lower())
+        )
+        if not same_rows:
+            self.load_prices(price_df)
+            self.load_plan(self.meal_plan)
+            return list(self.model.recipe_names)
+
+        changed_rows = np.flatnonzero(
+            ~(np.isclose(price_df['price'], old['price'], equal_nan=True)
+              & np.isclose(price_df['amount'], old['amount'], equal_nan=True))
+        )
+        affected = set()
+        for idx in changed_rows:
+            price, amount = price_df.at[idx, 'price'], price_df.at[idx, 'amount']
+            if pd.isna(price) or pd.isna(amount):
+                price, amount = 0.0, 0.0
+            affected.update(self.model.set_row_price(idx, price, amount))
+        self.price_df = price_df
+        self.model.price_df = price_df[['Ingredient', 'price', 'amount', 'unit']].reset_index(drop=True)
+        return [self.model.recipe_names[i] for i in sorted(affected)]
+
+    def poll(self):
+        """Check both inputs once. Returns the update summary, or None when nothing changed"""
+        changed = [path for path in (self.ingredients_file, self.meal_plan_file)
+                   if file_signature(path) != self.signatures.get(path)]
+        if not changed:
+            return None
+        start = time.perf_counter()
+        before = self.model.daily_costs()
+        trigger = []
+        try:
+            if self.ingredients_file in changed:
+                changed_recipes = self.update_prices(load_price_data(self.ingredients_file))
+                trigger.append(f"{len(changed_recipes)} recipes re-priced")
+            if self.meal_plan_file in changed:
+                new_recipes = self.load_plan(self.read_plan())
+                trigger.append(f"{new_recipes} new or edited recipes costed")
+        except Exception as e:
+            # Files are often caught half-written; try again on the next poll
+            print(f"Could not read inputs yet: {e}", flush=True)
+            return None
+        for path in changed:
+            self.signatures[path] = file_signature(path)
+
+        after = self.model.daily_costs()
+        before = before.reindex(after.index)
+        changed_days = after.index[~np.isclose(after.to_numpy(), before.to_numpy())]
+        summary = self.summary()
+        summary['trigger'] = ', '.join(trigger)
+        summary['changed_days'] = [int(day) for day in changed_days]
+        summary['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return summary
+
+    def meal_costs(self):
+        meal_costs = self.model.meal_costs()
+        return meal_costs.sort_values(MEAL_KEYS).reset_index(drop=True)
+
+    def summary(self):
+        meal_costs = self.meal_costs()
+        daily_costs = self.model.daily_costs()
+        monthly_total = self.model.monthly_total()
+        meal_type_averages = (meal_costs.groupby('category')['cost'].sum() / max(len(daily_costs), 1)).round(2)
+        return {
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'monthly_total': round(monthly_total, 2),
+            'average_daily_cost': round(monthly_total / max(len(daily_costs), 1), 2),
+            'meal_type_averages': meal_type_averages.to_dict(),
+            'most_expensive_day': int(daily_costs.idxmax()) if len(daily_costs) else None,
+        }
+
+    def write_outputs(self, summary):
+        """Write the summary first, then the cost tables calculate_daily_costs.py would write"""
+        os.makedirs("output", exist_ok=True)
+        with open(SUMMARY_FILE, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        meal_costs = self.meal_costs()
+        daily_costs = build_daily_costs(meal_costs)
+        meal_costs.to_excel(os.path.join("output", "recipe_total_costs.xlsx"), index=False)
+        daily_costs.to_excel(os.path.join("output", "daily_costs_per_month.xlsx"), index=False)
+        return meal_costs, daily_costs
+
+def watch(meal_plan_file, ingredients_file, as_json=False, charts=True, poll_seconds=POLL_SECONDS):
+    """Re-cost on every input change until interrupted"""
+    def report(summary):
+        if as_json:
+            print(json.dumps(summary, ensure_ascii=False), flush=True)
+        else:
+            print(f"[{summary['updated_at']}] {summary.get('trigger', 'initial costing')}: "
+                  f"monthly total {summary['monthly_total']:.2f} TL, "
+                  f"changed days {summary.get('changed_days', [])} "
+                  f"({summary.get('elapsed_ms', 0):.0f} ms)", flush=True)
+
+    watcher = CostWatcher(meal_plan_file, ingredients_file)
+    # Charts take seconds at print resolution, so they render off the polling loop and
+    # a burst of edits only redraws them for the latest costs
+    chart_pool = ThreadPoolExecutor(max_workers=1)
+    chart_job = None
+    charts_stale = False
+
+    summary = watcher.summary()
+    meal_costs, daily_costs = watcher.write_outputs(summary)
+    report(summary)
+    if charts:
+        chart_job = chart_pool.submit(create_visualizations, meal_costs, daily_costs, summary['monthly_total'])
+    if not as_json:
+        print(f"Watching {meal_plan_file} and {ingredients_file} (Ctrl+C to stop)", flush=True)
+    try:
+        while True:
+            time.sleep(poll_seconds)
+            summary = watcher.poll()
+            if summary is not None:
+                meal_costs, daily_costs = watcher.write_outputs(summary)
+                report(summary)
+                charts_stale = charts and bool(summary['changed_days'])
+            if charts_stale and (chart_job is None or chart_job.done()):
+                chart_job = chart_pool.submit(create_visualizations, meal_costs, daily_costs, watcher.model.monthly_total())
+                charts_stale = False
+    except KeyboardInterrupt:
+        print("Stopped watching", flush=True)
+    finally:
+        chart_pool.shutdown(wait=True)
+
+def main():
+    # Usage: python watch_costs.py [meal_plan_file] [ingredients_file] [--json] [--no-charts]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    meal_plan_file = args[0] if len(args) > 0 else 'meal_plan.json'
+    ingredients_file = args[1] if len(args) > 1 else 'unique_ingredients2.xlsx'
+    watch(meal_plan_file, ingredients_file, as_json='--json' in sys.argv, charts='--no-charts' not in sys.argv)
+
+if __name__ == "__main__":
+    run_main(main, "watch_costs")